@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional, Dict, Any
 import duckdb
 
+from validator.core.duck import project_columns, quote_ident, quote_literal
 from validator.core.geom_alias import normalize_geometry_view
 
 
@@ -10,6 +11,7 @@ def load_csv_view(
     con: duckdb.DuckDBPyConnection,
     path: str,
     view_name: str = "v",
+    needed_cols: Optional[list[str]] = None,
     *,
     canonical_geometry: Optional[str] = None,
     delimiter: Optional[str] = None,
@@ -25,10 +27,13 @@ def load_csv_view(
     Notes:
       - We keep ALL_VARCHAR=TRUE; logical typing is enforced later by the validator via TRY_CAST rules.
       - We build a raw view from read_csv_auto(), then create the final normalized view.
+      - When `needed_cols` is given, the raw view only projects those present in the
+        file. The projection is a COLUMNS(...) filter resolved while the view binds,
+        so read_csv_auto() is sniffed once instead of DESCRIBEd first.
     """
     opts = ["AUTO_DETECT=TRUE", "ALL_VARCHAR=TRUE"]
     if delimiter:
-        opts.append(f"DELIM='{delimiter}'")
+        opts.append(f"DELIM={quote_literal(delimiter)}")
 
     for k, v in read_opts.items():
         if isinstance(v, bool):
@@ -38,17 +43,38 @@ def load_csv_view(
         elif isinstance(v, (int, float)):
             opts.append(f"{k}={v}")
         else:
-            opts.append(f"{k}='{v}'")
+            opts.append(f"{k}={quote_literal(str(v))}")
 
     opts_sql = ", ".join(opts)
 
+    src = f"read_csv_auto({quote_literal(path)}, {opts_sql})"
     raw_view = f"{view_name}_raw"
-    con.execute(
-        f"""
-        CREATE OR REPLACE VIEW {raw_view} AS
-        SELECT * FROM read_csv_auto('{path}', {opts_sql})
-        """
-    )
+    select_list = "*"
+    if needed_cols:
+        names = ", ".join(quote_literal(c) for c in needed_cols)
+        select_list = f"COLUMNS(c -> c IN [{names}])"
+    try:
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT {select_list} FROM {src}"
+        )
+    except duckdb.BinderException:
+        if select_list == "*":
+            raise
+        # None of the needed columns exists: keep them all, as project_columns does.
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT * FROM {src}"
+        )
+    # Column names come from the catalog entry stored with the view, which
+    # does not sniff the file again.
+    present = [
+        r[0]
+        for r in con.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = ? ORDER BY ordinal_position",
+            [raw_view],
+        ).fetchall()
+    ]
+    cols, _ = project_columns(present, needed_cols)
 
     norm = normalize_geometry_view(
         con,
@@ -60,5 +86,6 @@ def load_csv_view(
     return view_name, {
         "mode": "csv",
         "read_options": {"options_sql": opts_sql},
+        "selected_columns": cols,
         "geometry_normalization": norm,
     }
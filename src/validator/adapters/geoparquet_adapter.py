@@ -1,5 +1,43 @@
+# validator/adapters/geoparquet_adapter.py
+from __future__ import annotations
+from typing import Optional
 import duckdb
 
-def load_parquet_view(con: duckdb.DuckDBPyConnection, path: str, view_name: str = "v"):
-    con.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM read_parquet('{path}')")
-    return view_name
+from validator.core.duck import project_columns, quote_ident, quote_literal
+from validator.core.geom_alias import normalize_geometry_view
+
+
+def load_parquet_view(
+    con: duckdb.DuckDBPyConnection,
+    path: str,
+    view_name: str = "v",
+    needed_cols: Optional[list[str]] = None,
+    *,
+    canonical_geometry: Optional[str] = None,
+):
+    """
+    Create a DuckDB view over a (Geo)Parquet file and normalize geometry.
+
+    When `needed_cols` is given, only those present in the file are projected so
+    the Parquet reader skips all other column chunks.
+    """
+    src = f"read_parquet({quote_literal(path)})"
+    present = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {src}").fetchall()]
+    cols, select_list = project_columns(present, needed_cols)
+
+    raw_view = f"{view_name}_raw"
+    con.execute(
+        f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT {select_list} FROM {src}"
+    )
+
+    norm = normalize_geometry_view(
+        con,
+        src_view=raw_view,
+        dst_view=view_name,
+        explicit_canonical=canonical_geometry,
+    )
+    return view_name, {
+        "mode": "parquet",
+        "selected_columns": cols,
+        "geometry_normalization": norm,
+    }
@@ -1,45 +1,214 @@
 from __future__ import annotations
+import atexit
+import functools
+import os
 import duckdb
 import sqlite3
+from pathlib import Path
 from typing import List, Tuple, Optional
 from validator.core.geom_alias import _duckdb_cols, _pick_first_present
-from validator.core.duck import ensure_spatial_extension
+from validator.core.duck import (
+    ensure_spatial_extension,
+    ensure_sqlite_extension,
+    quote_ident,
+    quote_literal,
+)
 
-def gpkg_integrity_errors(path: str) -> list[str]:
-    """Return non-'ok' messages from PRAGMA quick_check (fast integrity screen)."""
+# Rows per chunk when copying a layer through sqlite3 (bounded-memory fallback).
+FALLBACK_CHUNK_ROWS = 200_000
+
+# Materialize the normalized view once the decoded geometry is needed and the
+# layer is at least this large, so WKB/WKT parsing runs once instead of per scan.
+GEOMETRY_MATERIALIZE_MIN_ROWS = 50_000
+
+# Read-side tuning applied to every sqlite3 connection we open on a GeoPackage.
+# Write-side settings (journal_mode, synchronous) are deliberately left alone:
+# connections are read-only and must never rewrite the user's file header.
+_SQLITE_READ_PRAGMAS = (
+    "PRAGMA query_only=1",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+# 'GPKG' (1.2+), plus 'GP10' / 'GP11' written by GeoPackage 1.0 / 1.1.
+_GPKG_APPLICATION_IDS = {0x47504B47, 0x47503130, 0x47503131}
+
+
+def _tune(db: sqlite3.Connection) -> None:
+    for pragma in _SQLITE_READ_PRAGMAS:
+        db.execute(pragma)
+
+
+def _open_gpkg(path: str) -> sqlite3.Connection:
+    """Open a GeoPackage read-only with read-side PRAGMA tuning applied."""
+    db = sqlite3.connect(
+        Path(path).resolve().as_uri() + "?mode=ro", uri=True, isolation_level=None
+    )
+    _tune(db)
+    return db
+
+
+# One read-only connection per GeoPackage path, shared by the helpers below so a
+# validation run opens (and parses the schema of) each file only once. The file
+# version is remembered so a replaced file gets a fresh connection.
+_CONN_CACHE: dict[str, tuple[tuple, sqlite3.Connection]] = {}
+
+
+def _get_db(path: str) -> sqlite3.Connection:
+    """Return the cached read-only connection for `path`, opening it on first use."""
+    key = _file_key(path)
+    cached = _CONN_CACHE.get(key[0])
+    if cached is not None:
+        if cached[0] == key:
+            return cached[1]
+        cached[1].close()
+    db = _open_gpkg(path)
+    _CONN_CACHE[key[0]] = (key, db)
+    return db
+
+
+def close_gpkg_connections() -> None:
+    """Close all cached GeoPackage connections and drop the per-file PRAGMA caches."""
+    while _CONN_CACHE:
+        _, (_, db) = _CONN_CACHE.popitem()
+        db.close()
+    for cached in (_quick_check, _list_layers, _table_info):
+        cached.cache_clear()
+
+
+atexit.register(close_gpkg_connections)
+
+
+def _gpkg_header_errors(path: str) -> list[str]:
+    """Cheap screen: SQLite magic string and GeoPackage application_id in the file header."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(100)
+    except OSError as e:
+        return [f"header_read_failed: {e}"]
+    if len(header) < 100 or not header.startswith(_SQLITE_MAGIC):
+        return ["not_a_sqlite_database"]
+    app_id = int.from_bytes(header[68:72], "big")
+    if app_id not in _GPKG_APPLICATION_IDS:
+        return [f"unexpected_application_id: {app_id:#x}"]
+    return []
+
+
+def gpkg_integrity_errors(path: str, limit: int = 100) -> list[str]:
+    """
+    Return non-'ok' messages from PRAGMA quick_check (fast integrity screen).
+
+    quick_check stops after `limit` problems. With QUAP_SKIP_INTEGRITY=1 the
+    page scan is skipped and only the file header is checked.
+    """
+    if os.getenv("QUAP_SKIP_INTEGRITY") == "1":
+        return _gpkg_header_errors(path)
+    return list(_quick_check(path, _file_key(path), int(limit)))
+
+
+def _file_key(path: str) -> tuple:
+    """Cache key that changes when the file at `path` is replaced or modified."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (os.path.abspath(path), None, None)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+# Catalog and integrity lookups are cached per (path, mtime, size): a batch or
+# repeated run on an unchanged file skips the sqlite round-trips entirely.
+@functools.lru_cache(maxsize=16)
+def _quick_check(path: str, key: tuple, limit: int) -> tuple[str, ...]:
     try:
-        with sqlite3.connect(path) as db:
-            rows = db.execute("PRAGMA quick_check;").fetchall()
-        return [r[0] for r in rows if r[0] != "ok"]
+        rows = _get_db(path).execute(f"PRAGMA quick_check({limit});").fetchall()
+        return tuple(r[0] for r in rows if r[0] != "ok")
     except Exception as e:
-        return [f"quick_check_failed: {e}"]
+        return (f"quick_check_failed: {e}",)
 
 
 def gpkg_list_layers(path: str) -> list[str]:
     """Return feature layers (tables) in the GeoPackage."""
+    return list(_list_layers(path, _file_key(path)))
+
+
+@functools.lru_cache(maxsize=16)
+def _list_layers(path: str, key: tuple) -> tuple[str, ...]:
     try:
-        with sqlite3.connect(path) as db:
-            rows = db.execute(
+        rows = (
+            _get_db(path)
+            .execute(
                 "SELECT table_name FROM gpkg_contents WHERE data_type='features' ORDER BY table_name"
-            ).fetchall()
+            )
+            .fetchall()
+        )
         if rows:
-            return [r[0] for r in rows]
+            return tuple(r[0] for r in rows)
     except Exception:
         pass
     try:
         import pyogrio
 
         layers = pyogrio.list_layers(path)
-        return [t[0] if isinstance(t, (list, tuple)) else t for t in layers]
+        return tuple(t[0] if isinstance(t, (list, tuple)) else t for t in layers)
     except Exception:
-        return []
+        return ()
 
 
 def gpkg_table_columns(path: str, layer: str) -> list[str]:
     """List column names for a given layer/table."""
-    with sqlite3.connect(path) as db:
-        rows = db.execute(f'PRAGMA table_info("{layer}")').fetchall()
-    return [r[1] for r in rows]
+    return [name for name, _ in _table_info(path, _file_key(path), layer)]
+
+
+def gpkg_column_types(path: str, layer: str) -> dict[str, str]:
+    """Declared SQLite type of each column of a layer/table (upper-cased)."""
+    return {name: decl for name, decl in _table_info(path, _file_key(path), layer)}
+
+
+@functools.lru_cache(maxsize=16)
+def _table_info(path: str, key: tuple, layer: str) -> tuple[tuple[str, str], ...]:
+    rows = _get_db(path).execute(f"PRAGMA table_info({quote_ident(layer)})").fetchall()
+    return tuple((r[1], (r[2] or "").upper()) for r in rows)
+
+
+# GeoPackage column types (spec table 1) that map onto a native DuckDB type in
+# the fallback copy; everything else (TEXT, DATE, BOOLEAN, geometry BLOBs, ...)
+# is kept as VARCHAR, like the scanner's sqlite_all_varchar.
+_GPKG_NATIVE_TYPES = {
+    "INTEGER": "BIGINT",
+    "INT": "BIGINT",
+    "TINYINT": "BIGINT",
+    "SMALLINT": "BIGINT",
+    "MEDIUMINT": "BIGINT",
+    "BIGINT": "BIGINT",
+    "REAL": "DOUBLE",
+    "DOUBLE": "DOUBLE",
+    "FLOAT": "DOUBLE",
+}
+
+
+def _fits(arrow_type, duck_type: str) -> bool:
+    """Whether a fetched column can be inserted into `duck_type` without a lossy cast."""
+    import pyarrow.types as pat
+
+    if duck_type == "VARCHAR" or pat.is_null(arrow_type):
+        return True
+    if duck_type == "BIGINT":
+        return pat.is_integer(arrow_type)
+    return pat.is_integer(arrow_type) or pat.is_floating(arrow_type)
+
+
+def _arrow_column(values: list):
+    """Build an Arrow array for one fetched column, falling back to strings for mixed types."""
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(
+            [None if v is None else str(v) for v in values], type=pa.string()
+        )
 
 
 def _guess_canonical(present_cols: dict) -> Optional[str]:
@@ -77,7 +246,9 @@ def _normalize_geometry_view(
     canonical = explicit_canonical or _guess_canonical(cols)
     if not canonical:
         # Nothing to normalize; pass-through
-        con.execute(f"CREATE OR REPLACE VIEW {dst_view} AS SELECT * FROM {src_view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(dst_view)} AS SELECT * FROM {quote_ident(src_view)}"
+        )
         return {
             "normalized": False,
             "canonical": None,
@@ -93,7 +264,9 @@ def _normalize_geometry_view(
 
     # If canonical already exists, just pass-through
     if canonical.lower() in cols:
-        con.execute(f"CREATE OR REPLACE VIEW {dst_view} AS SELECT * FROM {src_view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(dst_view)} AS SELECT * FROM {quote_ident(src_view)}"
+        )
         return {
             "normalized": False,
             "canonical": canonical,
@@ -105,7 +278,9 @@ def _normalize_geometry_view(
     src_name, src_type = _pick_first_present(cols, aliases)
     if not src_name:
         # No alias → pass-through
-        con.execute(f"CREATE OR REPLACE VIEW {dst_view} AS SELECT * FROM {src_view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(dst_view)} AS SELECT * FROM {quote_ident(src_view)}"
+        )
         return {
             "normalized": False,
             "canonical": canonical,
@@ -116,17 +291,17 @@ def _normalize_geometry_view(
     # Build a robust expression:
     # sqlite_scanner often returns everything as VARCHAR when sqlite_all_varchar=true.
     # Try WKB (BLOB) cast first, then WKT as a fallback.
-    src_lc = src_name
+    src_lc = quote_ident(src_name)
     expr = f"COALESCE(ST_GeomFromWKB(TRY_CAST({src_lc} AS BLOB)), ST_GeomFromText({src_lc}))"
 
     ensure_spatial_extension(con)
     con.execute(
         f"""
-        CREATE OR REPLACE VIEW {dst_view} AS
+        CREATE OR REPLACE VIEW {quote_ident(dst_view)} AS
         SELECT
           *,
-          {expr} AS {canonical}
-        FROM {src_view}
+          {expr} AS {quote_ident(canonical)}
+        FROM {quote_ident(src_view)}
         """
     )
     return {
@@ -137,6 +312,74 @@ def _normalize_geometry_view(
     }
 
 
+def _maybe_materialize(
+    con,
+    view_name: str,
+    norm_info: dict,
+    needed_cols: Optional[list[str]],
+    n_rows: int,
+) -> bool:
+    """
+    Replace `view_name` by a view over a temp table holding its rows when the
+    view decodes a geometry the template asks for and the layer has at least
+    GEOMETRY_MATERIALIZE_MIN_ROWS rows. Only the copy paths call this: their
+    row count is known, while the sqlite_scanner view stays out-of-core.
+    """
+    canonical = norm_info.get("canonical")
+    if not norm_info.get("normalized") or canonical not in (needed_cols or []):
+        return False
+    if n_rows < GEOMETRY_MATERIALIZE_MIN_ROWS:
+        return False
+    mat = f"{view_name}_mat"
+    con.execute(
+        f"CREATE OR REPLACE TEMP TABLE {quote_ident(mat)} AS SELECT * FROM {quote_ident(view_name)}"
+    )
+    con.execute(
+        f"CREATE OR REPLACE VIEW {quote_ident(view_name)} AS SELECT * FROM {quote_ident(mat)}"
+    )
+    return True
+
+
+def _copy_layer(
+    con: duckdb.DuckDBPyConnection,
+    db: sqlite3.Connection,
+    layer: str,
+    cols: list[str],
+    types: list[str],
+    table_name: str,
+) -> Optional[int]:
+    """
+    Copy `cols` of `layer` into a fresh temp table with the given column types.
+
+    Returns the number of rows copied, or None (table left partial) as soon as
+    a chunk holds a value that does not fit its column type.
+    """
+    import pyarrow as pa
+
+    cols_def = ", ".join([f"{quote_ident(c)} {t}" for c, t in zip(cols, types)])
+    con.execute(f"CREATE OR REPLACE TEMP TABLE {quote_ident(table_name)} ({cols_def})")
+
+    # One streaming cursor: SQLite walks the table once instead of
+    # re-scanning `offset` rows per LIMIT/OFFSET page. Each chunk is inserted
+    # straight from its Arrow relation, with no register/unregister or SQL text.
+    select_sql = ", ".join([quote_ident(c) for c in cols])
+    cur = db.execute(f"SELECT {select_sql} FROM {quote_ident(layer)}")
+    offset = 0
+    while True:
+        rows = cur.fetchmany(FALLBACK_CHUNK_ROWS)
+        if not rows:
+            break
+        arrays = [_arrow_column([r[i] for r in rows]) for i in range(len(cols))]
+        if not all(_fits(a.type, t) for a, t in zip(arrays, types)):
+            cur.close()
+            return None
+        batch = pa.RecordBatch.from_arrays(arrays, names=cols)
+        con.from_arrow(batch).insert_into(table_name)
+        offset += len(rows)
+        del batch, arrays, rows
+    return offset
+
+
 def load_gpkg_view(
     con: duckdb.DuckDBPyConnection,
     path: str,
@@ -155,85 +398,114 @@ def load_gpkg_view(
     """
     raw_view = f"{view_name}_raw"
 
+    # Same projection for every load path; a named column list is never widened
+    # to `*` (at least one column is needed for a valid SELECT).
+    present = gpkg_table_columns(path, layer)
+    present_set = set(present)
+    cols = [c for c in (needed_cols or present) if c in present_set]
+    if not cols:
+        cols = [present[0]] if present else []
+    table_name = "_gpkg_tmp"
+
     # 1) Try sqlite_scanner (zero-copy)
     diag = {}
+    sqlite_loaded = False
     try:
-        con.execute("INSTALL sqlite;")
-        con.execute("LOAD sqlite;")
+        ensure_sqlite_extension(con)
+        sqlite_loaded = True
         # Keep this for stable text typing across diverse GPKGs:
         con.execute("SET sqlite_all_varchar=true;")
 
-        con.execute(f"ATTACH '{path}' AS gpkg (TYPE SQLITE)")
+        con.execute(f"ATTACH {quote_literal(path)} AS gpkg (TYPE SQLITE)")
 
-        present = gpkg_table_columns(path, layer)
-        cols = needed_cols or present
-        cols = [c for c in cols if c in present]
-        select_list = "*" if not cols else ", ".join([f'"{c}"' for c in cols])
+        select_list = ", ".join([quote_ident(c) for c in cols])
 
         con.execute(
-            f'CREATE OR REPLACE VIEW {raw_view} AS SELECT {select_list} FROM gpkg."{layer}"'
+            f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT {select_list} FROM gpkg.{quote_ident(layer)}"
         )
         norm_info = _normalize_geometry_view(
             con, raw_view, view_name, explicit_canonical=canonical_geometry
         )
+        # No materialization here: the row count is unknown, and validation
+        # reads the view in a single scan, decoding each geometry once anyway.
         return view_name, {
             "mode": "sqlite_scanner",
-            "selected_columns": cols or ["*"],
+            "selected_columns": cols,
             "sqlite_all_varchar": True,
+            "materialized": False,
             **{"geometry_normalization": norm_info},
         }
     except Exception as e:
         diag = {"mode": "sqlite_scanner_failed", "error": str(e)}
 
-    # 2) Fallback: chunk copy from SQLite → DuckDB temp table (bounded memory)
-    present = gpkg_table_columns(path, layer)
-    cols = needed_cols or present
-    cols = [c for c in cols if c in present]
-    if not cols:
-        cols = [present[0]] if present else []
-
-    with sqlite3.connect(path) as db:
+    # 2) Extension loaded but ATTACH/view failed: copy the layer with a single
+    #    sqlite_scan CTAS, still scanned by DuckDB rather than row by row in Python.
+    if sqlite_loaded and cols:
+        select_sql = ", ".join([quote_ident(c) for c in cols])
         try:
-            total = db.execute(f'SELECT COUNT(*) FROM "{layer}"').fetchone()[0]
-        except Exception:
-            total = None
-        step = 200_000
-        offset = 0
-        created = False
-        table_name = "_gpkg_tmp"
-
-        while True:
-            q = f'SELECT {", ".join([f""" "{c}" """ for c in cols])} FROM "{layer}" LIMIT {step} OFFSET {offset}'
-            rows = db.execute(q).fetchmany(step)
-            if not rows:
-                break
-            import pandas as pd
-
-            chunk = pd.DataFrame(rows, columns=cols)
-            if not created:
-                cols_def = ", ".join([f'"{c}" VARCHAR' for c in chunk.columns])
-                con.execute(f"CREATE TEMP TABLE {table_name} ({cols_def})")
-                created = True
-            con.register("_gpkg_chunk", chunk)
             con.execute(
-                f'INSERT INTO {table_name} SELECT {", ".join([f""" "{c}" """ for c in cols])} FROM _gpkg_chunk'
+                f"CREATE OR REPLACE TEMP TABLE {quote_ident(table_name)} AS SELECT {select_sql} "
+                f"FROM sqlite_scan({quote_literal(path)}, {quote_literal(layer)})"
             )
-            con.unregister("_gpkg_chunk")
-            offset += len(chunk)
-            if total is not None and offset >= total:
-                break
-
-        if not created:
-            con.execute("CREATE TEMP TABLE _gpkg_tmp (_dummy VARCHAR)")
-            con.execute("DELETE FROM _gpkg_tmp")
+            n_rows = con.execute(
+                f"SELECT COUNT(*) FROM {quote_ident(table_name)}"
+            ).fetchone()[0]
+            con.execute(
+                f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT * FROM {quote_ident(table_name)}"
+            )
+            norm_info = _normalize_geometry_view(
+                con, raw_view, view_name, explicit_canonical=canonical_geometry
+            )
+            materialized = _maybe_materialize(
+                con, view_name, norm_info, needed_cols, n_rows=n_rows
+            )
+            return view_name, {
+                **diag,
+                "mode": "sqlite_scan_copy",
+                "loaded_rows": n_rows,
+                "materialized": materialized,
+                "selected_columns": cols,
+                "geometry_normalization": norm_info,
+            }
+        except Exception as e:
+            diag["sqlite_scan_error"] = str(e)
 
-        con.execute(f"CREATE OR REPLACE VIEW {raw_view} AS SELECT * FROM {table_name}")
-        norm_info = _normalize_geometry_view(
-            con, raw_view, view_name, explicit_canonical=canonical_geometry
+    # 3) Fallback: chunk copy from SQLite → DuckDB temp table (bounded memory)
+    db = _get_db(path)
+    typed = False
+    if not cols:
+        con.execute(
+            f"CREATE OR REPLACE TEMP TABLE {quote_ident(table_name)} (_dummy VARCHAR)"
         )
-        return view_name, {
-            **diag,
-            "fallback_loaded_rows": offset,
-            "selected_columns": cols,
-            "geometry_normalization": norm_info,
-        }
+        offset = 0
+    else:
+        # Integer/real columns are copied as BIGINT/DOUBLE so the validator does
+        # not cast them back from text. SQLite does not enforce declared types:
+        # if any value does not fit, the copy is redone with all-VARCHAR columns
+        # and the validator reports the bad values as DTYPE_MISMATCH.
+        decl = gpkg_column_types(path, layer)
+        types = [_GPKG_NATIVE_TYPES.get(decl.get(c, ""), "VARCHAR") for c in cols]
+        offset = None
+        if any(t != "VARCHAR" for t in types):
+            offset = _copy_layer(con, db, layer, cols, types, table_name)
+            typed = offset is not None
+        if offset is None:
+            offset = _copy_layer(con, db, layer, cols, ["VARCHAR"] * len(cols), table_name)
+
+    con.execute(
+        f"CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT * FROM {quote_ident(table_name)}"
+    )
+    norm_info = _normalize_geometry_view(
+        con, raw_view, view_name, explicit_canonical=canonical_geometry
+    )
+    materialized = _maybe_materialize(
+        con, view_name, norm_info, needed_cols, n_rows=offset
+    )
+    return view_name, {
+        **diag,
+        "fallback_loaded_rows": offset,
+        "typed_copy": typed,
+        "materialized": materialized,
+        "selected_columns": cols,
+        "geometry_normalization": norm_info,
+    }
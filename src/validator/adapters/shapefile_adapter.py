@@ -1,8 +1,11 @@
 from __future__ import annotations
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import duckdb
 
+from validator.core.duck import quote_ident
+from validator.core.geom_alias import normalize_geometry_view
+
 def shapefile_integrity_errors(path: str) -> list[str]:
     """
     Basic checks: sidecar presence (.shp, .shx, .dbf) and GDAL header read via pyogrio.
@@ -25,53 +28,46 @@ def load_shapefile_into_duck(
     needed_cols: list[str],
     table_name: str = "_shape_tmp",
     view_name: str = "v",
+    *,
+    canonical_geometry: Optional[str] = None,
 ) -> Tuple[str, dict]:
     """
-    Paged read with pyogrio.read_arrow → insert into DuckDB temp table (VARCHAR columns),
-    then create view 'v'. Keeps memory bounded.
+    Stream the layer through pyogrio's Arrow reader into a DuckDB temp table,
+    then create view 'v' with normalized geometry. DuckDB consumes the record
+    batches directly, so memory stays bounded to a batch and column types are
+    the Arrow types GDAL reports.
     """
     import pyogrio
-    step = 200_000
-    offset = 0
-    created = False
     selected_cols = needed_cols[:] if needed_cols else None
 
     # Intersect with actual fields to avoid loading non-existent columns
     try:
         info = pyogrio.read_info(path)
-        present = [f["name"] for f in info["fields"]]
+        present = [str(f) for f in info["fields"]]
         if selected_cols:
             selected_cols = [c for c in selected_cols if c in present]
         else:
             selected_cols = present
     except Exception:
-        # hard fallback: let GDAL choose columns in first chunk
+        # hard fallback: let GDAL choose columns
         selected_cols = needed_cols[:] if needed_cols else None
 
-    total_rows = 0
-    while True:
-        arr = pyogrio.read_arrow(
-            path,
-            columns=selected_cols,
-            skip_features=offset,
-            max_features=step,
-        )
-        if arr.num_rows == 0:
-            break
-        df = arr.to_pandas()
-        if not created:
-            cols_def = ", ".join([f'"{c}" VARCHAR' for c in df.columns])
-            con.execute(f"CREATE TEMP TABLE {table_name} ({cols_def})")
-            created = True
-        con.register("_shape_chunk", df)
-        con.execute(f'INSERT INTO {table_name} SELECT {", ".join([f""" "{c}" """ for c in df.columns])} FROM _shape_chunk')
-        con.unregister("_shape_chunk")
-        offset += df.shape[0]
-        total_rows += df.shape[0]
-
-    if not created:
-        con.execute('CREATE TEMP TABLE _shape_tmp (_dummy VARCHAR)')
-        con.execute("DELETE FROM _shape_tmp")
+    with pyogrio.raw.open_arrow(path, columns=selected_cols, use_pyarrow=True) as (_, reader):
+        con.register("_shape_reader", reader)
+        try:
+            con.execute(f"CREATE OR REPLACE TEMP TABLE {quote_ident(table_name)} AS SELECT * FROM _shape_reader")
+        finally:
+            con.unregister("_shape_reader")
+    total_rows = con.execute(f"SELECT COUNT(*) FROM {quote_ident(table_name)}").fetchone()[0]
 
-    con.execute(f'CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM {table_name}')
-    return view_name, {"selected_columns": selected_cols, "loaded_rows": total_rows}
+    raw_view = f"{view_name}_raw"
+    con.execute(f'CREATE OR REPLACE VIEW {quote_ident(raw_view)} AS SELECT * FROM {quote_ident(table_name)}')
+    norm = normalize_geometry_view(
+        con, src_view=raw_view, dst_view=view_name, explicit_canonical=canonical_geometry
+    )
+    return view_name, {
+        "mode": "arrow_stream",
+        "selected_columns": selected_cols,
+        "loaded_rows": total_rows,
+        "geometry_normalization": norm,
+    }
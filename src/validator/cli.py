@@ -1,13 +1,17 @@
 from __future__ import annotations
 import os
+import glob
 import json
 import click
+from concurrent.futures import ThreadPoolExecutor
 import duckdb
+from pathlib import PurePath
 
 from validator.core.templates import TemplateRegistry
 from validator.core.engine import validate_with_duckdb
-from validator.core.reporting import build_report, render_text
+from validator.core.reporting import Report, build_report, render_text, write_text
 from validator.core.compression import maybe_decompress, UnpackError
+from validator.core.duck import close_connection, get_connection, reset_connection
 
 from validator.adapters.csv_adapter import load_csv_view
 from validator.adapters.geoparquet_adapter import load_parquet_view
@@ -15,24 +19,41 @@ from validator.adapters.gpkg_adapter import (
     load_gpkg_view,
     gpkg_integrity_errors,
     gpkg_list_layers,
+    close_gpkg_connections,
 )
 from validator.adapters.shapefile_adapter import (
     load_shapefile_into_duck,
     shapefile_integrity_errors,
 )
 
+_FORMAT_BY_SUFFIX = {
+    ".parquet": "GEOPARQUET",
+    ".gpkg": "GEOPACKAGE",
+    ".shp": "SHAPEFILE",
+    ".csv": "CSV",
+    ".csv.gz": "CSV",
+    ".csv.bz2": "CSV",
+}
+
 
 def detect_format(path: str) -> str:
-    p = path.lower()
-    if p.endswith(".parquet"):
-        return "GEOPARQUET"
-    if p.endswith(".gpkg"):
-        return "GEOPACKAGE"
-    if p.endswith(".shp"):
-        return "SHAPEFILE"
-    if p.endswith(".csv") or p.endswith(".csv.gz") or p.endswith(".csv.bz2"):
-        return "CSV"
-    raise click.UsageError("Cannot detect format from extension; pass --format")
+    # Try the double suffix first so ".csv.gz" wins over a bare ".gz".
+    suffixes = PurePath(path.lower()).suffixes
+    fmt = _FORMAT_BY_SUFFIX.get("".join(suffixes[-2:]))
+    if fmt is None and suffixes:
+        fmt = _FORMAT_BY_SUFFIX.get(suffixes[-1])
+    if fmt is None:
+        raise click.UsageError("Cannot detect format from extension; pass --format")
+    return fmt
+
+
+def _read_index(d: str) -> dict | None:
+    """Parsed `<d>/index.json`, or None if it is missing or unreadable."""
+    try:
+        with open(os.path.join(d, "index.json"), "rb") as f:
+            return json.loads(f.read())
+    except Exception:
+        return None
 
 
 def _list_templates(search_dirs: list[str]) -> int:
@@ -60,13 +81,14 @@ def _list_templates(search_dirs: list[str]) -> int:
     seen = set()
     listed = []
 
-    for d in [p for p in dirs if p and os.path.isdir(p)]:
-        idx = os.path.join(d, "index.json")
-        if not os.path.exists(idx):
-            continue
-        try:
-            data = json.load(open(idx, "r", encoding="utf-8"))
-        except Exception:
+    # Read every index concurrently (they may sit on slow network mounts);
+    # map() keeps the search order, so the first match still wins.
+    dirs = [d for d in dirs if d]
+    with ThreadPoolExecutor(max_workers=min(8, len(dirs) or 1)) as pool:
+        indexes = list(pool.map(_read_index, dirs))
+
+    for d, data in zip(dirs, indexes):
+        if data is None:
             continue
         for t in data.get("templates", []):
             tid = t.get("template_id")
@@ -88,136 +110,64 @@ def _list_templates(search_dirs: list[str]) -> int:
     return 0
 
 
-@click.command(context_settings={"help_option_names": ["-h", "--help"]})
-@click.option(
-    "--input",
-    "input_path",
-    required=False,
-    help="Path/URI to input file",
-)
-@click.option(
-    "--format",
-    "fmt",
-    type=click.Choice(["CSV", "GEOPARQUET", "GEOPACKAGE", "SHAPEFILE"]),
-    required=False,
-    help="Input format (auto-detected from extension if omitted)",
-)
-@click.option("--layer", default=None, help="Layer (table) for GeoPackage")
-@click.option("--template-id", required=False, help="Template id to use")
-@click.option("--template-version", default=None, help="Specific template version")
-@click.option(
-    "--templates-dir",
-    multiple=True,
-    default=[],
-    help="Directory with templates (can be used multiple times). "
-    "Overrides DS_TEMPLATES_DIR and packaged defaults.",
-)
-@click.option(
-    "--template-schema",
-    default=None,
-    help="Path to template JSON-Schema (optional)",
-)
-@click.option("--report", default=None, help="Write JSON report to this path")
-@click.option(
-    "--print-json",
-    is_flag=True,
-    help="Print JSON report to stdout (in addition to text summary)",
-)
-@click.option(
-    "--list-templates",
-    is_flag=True,
-    help="List available templates and exit (no validation performed).",
-)
-@click.option(
-    "--debug",
-    is_flag=True,
-    help="Print extra diagnostics (adapters).",
-)
-def main(
-    input_path: str | None,
-    fmt: str | None,
-    layer: str | None,
-    template_id: str | None,
-    template_version: str | None,
-    templates_dir: tuple[str, ...],
-    template_schema: str | None,
-    report: str | None,
-    print_json: bool,
-    list_templates: bool,
-    debug: bool,
-):
-    """
-    Template-driven, memory-safe validator for CSV/GeoParquet/GeoPackage/Shapefile.
+def _glob_root(pattern: str) -> str:
+    """Longest leading directory of `pattern` that contains no glob magic."""
+    parts = []
+    for part in os.path.dirname(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or ("/" if pattern.startswith("/") else ".")
 
-    Examples:
-      quap-validate --list-templates
-      quap-validate --input data.parquet --template-id lpis_population --print-json
-    """
-    if list_templates:
-        search_dirs = list(templates_dir or [])
-        raise SystemExit(_list_templates(search_dirs))
 
-    if not input_path:
-        raise click.UsageError("--input is required (unless you pass --list-templates)")
-    if not template_id:
-        raise click.UsageError(
-            "--template-id is required (unless you pass --list-templates)"
-        )
+def _provenance() -> dict:
+    return {
+        "tool_version": "0.2.0",
+        "git_rev": os.environ.get("GIT_REV"),
+        "run_id": os.environ.get("RUN_ID"),
+    }
 
-    reg = TemplateRegistry(
-        list(templates_dir or []),
-        schema_path=(
-            template_schema
-            if template_schema and os.path.exists(template_schema)
-            else None
-        ),
-    )
-    tpl = reg.load(template_id, version=template_version)
 
-    cleanup = lambda: None
+def _validate_input(
+    con: duckdb.DuckDBPyConnection,
+    tpl: dict,
+    input_path: str,
+    fmt: str | None,
+    layer: str | None,
+    quick_check_limit: int,
+) -> tuple[Report, dict]:
+    """Load and validate one input on `con`; returns (report, adapter diagnostics)."""
+    template_meta = {"template_id": tpl["template_id"], "version": tpl["version"]}
+    size_bytes = os.path.getsize(input_path) if os.path.exists(input_path) else None
+
     try:
         dataset_path, cleanup = maybe_decompress(input_path)
     except UnpackError as e:
-        con = duckdb.connect()
         engine_result = {
             "ok": False,
             "errors": [{"code": "UNPACK_ERROR", "detail": str(e)}],
             "warnings": [],
             "metrics": {},
         }
-        template_meta = {"template_id": tpl["template_id"], "version": tpl["version"]}
         input_meta = {
             "path": input_path,
             "format": None,
             "layer": None,
-            "size_bytes": (
-                os.path.getsize(input_path) if os.path.exists(input_path) else None
-            ),
-        }
-        provenance = {
-            "tool_version": "0.2.0",
-            "git_rev": os.environ.get("GIT_REV"),
-            "run_id": os.environ.get("RUN_ID"),
+            "size_bytes": size_bytes,
         }
         rep = build_report(
-            engine_result, template_meta, input_meta, provenance=provenance
+            engine_result, template_meta, input_meta, provenance=_provenance()
         )
-        click.echo(render_text(rep))
-        if print_json:
-            click.echo(rep.to_json())
-        try:
-            con.close()
-        except Exception:
-            pass
-        raise SystemExit(rep.exit_code())
-
-    fmt = fmt or detect_format(str(dataset_path))
+        return rep, {}
 
-    con = duckdb.connect()
     diagnostics: dict = {}
 
     engine_result = {"ok": True, "errors": [], "warnings": [], "metrics": {}}
-    needed_cols = [c["name"] for c in tpl.get("columns", [])] or None
+    # Adapters project only template columns; keep every column when the
+    # template must flag extra ones.
+    needed_cols = None
+    if tpl.get("allow_extra_columns", True):
+        needed_cols = [c["name"] for c in tpl.get("columns", [])] or None
 
     tpl_id_lower = (tpl.get("template_id") or "").lower()
     tpl_cols = [c.get("name", "").lower() for c in tpl.get("columns", [])]
@@ -235,35 +185,32 @@ def main(
         needed_cols = list(dict.fromkeys(merged))
 
     try:
+        # Inside the try: in batch mode an unrecognized file is reported (and
+        # its unpack dir cleaned up) instead of aborting the whole run.
+        fmt = fmt or detect_format(str(dataset_path))
         if fmt == "CSV":
-            load_csv_view(
+            _, diagnostics = load_csv_view(
                 con,
                 str(dataset_path),
                 "v",
+                needed_cols,
                 canonical_geometry=canonical_geom,
                 # delimiter=";",  # uncomment if you want to force QUAP CSV spec
             )
 
         elif fmt == "GEOPARQUET":
-            # (optional) quick metadata probe to flag corruption early
-            try:
-                import pyarrow.parquet as pq
-
-                _ = pq.ParquetFile(str(dataset_path)).metadata
-            except Exception as e:
-                engine_result["errors"].append(
-                    {"code": "CORRUPTED_FILE", "detail": f"parquet_metadata: {e}"}
-                )
-                engine_result["ok"] = False
-            load_parquet_view(
+            # DuckDB reads the footer while describing the file, so a corrupt
+            # file surfaces below as CORRUPTED_FILE (open_failed).
+            _, diagnostics = load_parquet_view(
                 con,
                 str(dataset_path),
                 "v",
+                needed_cols,
                 canonical_geometry=canonical_geom,
             )
 
         elif fmt == "GEOPACKAGE":
-            errs = gpkg_integrity_errors(str(dataset_path))
+            errs = gpkg_integrity_errors(str(dataset_path), limit=quick_check_limit)
             if errs:
                 engine_result["errors"].append(
                     {"code": "CORRUPTED_FILE", "detail": "; ".join(errs)}
@@ -313,15 +260,11 @@ def main(
         )
         engine_result["ok"] = False
 
-    try:
-        row_count = con.execute("SELECT COUNT(*) FROM v").fetchone()[0]
-        engine_result["row_count"] = row_count
-    except Exception:
-        engine_result["row_count"] = None
-
+    engine_result["row_count"] = None
     if engine_result["ok"]:
         try:
             vr = validate_with_duckdb("v", tpl, con)
+            engine_result["row_count"] = vr.get("row_count")
             for k in ("errors", "warnings"):
                 engine_result[k].extend(vr.get(k, []))
             engine_result["metrics"] = {
@@ -335,6 +278,13 @@ def main(
                 {"code": "CORRUPTED_FILE", "detail": f"validation_failed: {e}"}
             )
             engine_result["ok"] = False
+    else:
+        # Validation is skipped, but still report how many rows were readable.
+        try:
+            row_count = con.execute("SELECT COUNT(*) FROM v").fetchone()[0]
+            engine_result["row_count"] = row_count
+        except Exception:
+            pass
 
     unpack_diag = {}
     if str(dataset_path) != str(input_path):
@@ -352,39 +302,198 @@ def main(
             },
         }
 
-    template_meta = {"template_id": tpl["template_id"], "version": tpl["version"]}
     input_meta = {
         "path": input_path,
         "format": fmt,
         "layer": layer,
-        "size_bytes": (
-            os.path.getsize(input_path) if os.path.exists(input_path) else None
-        ),
-    }
-    provenance = {
-        "tool_version": "0.2.0",
-        "git_rev": os.environ.get("GIT_REV"),
-        "run_id": os.environ.get("RUN_ID"),
+        "size_bytes": size_bytes,
     }
-    rep = build_report(engine_result, template_meta, input_meta, provenance=provenance)
+    rep = build_report(
+        engine_result, template_meta, input_meta, provenance=_provenance()
+    )
+
+    try:
+        cleanup()
+    except Exception:
+        pass
+
+    return rep, diagnostics
 
+
+def _emit(
+    rep: Report, print_json: bool, report: str | None, debug: bool, diagnostics: dict
+) -> None:
     click.echo(render_text(rep))
     if print_json:
-        click.echo(rep.to_json())
-    if report:
+        # Encode once and reuse the text for the report file.
+        payload = rep.to_json()
+        click.echo(payload)
+        if report:
+            write_text(report, payload)
+    elif report:
         rep.write_json(report)
 
     if debug and diagnostics:
         click.echo(
-            f"\n[debug] adapter diagnostics: {json.dumps(engine_result.get('metrics', {}).get('adapter_diagnostics', {}), indent=2)}"
+            f"\n[debug] adapter diagnostics: {json.dumps(rep.metrics.get('adapter_diagnostics', {}), indent=2)}"
         )
 
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--input",
+    "input_path",
+    required=False,
+    help="Path/URI to input file",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["CSV", "GEOPARQUET", "GEOPACKAGE", "SHAPEFILE"]),
+    required=False,
+    help="Input format (auto-detected from extension if omitted)",
+)
+@click.option(
+    "--input-glob",
+    default=None,
+    help="Validate every file matching this glob in one process, sharing the "
+    "template and DuckDB connection. With --report, reports are written "
+    "into that directory.",
+)
+@click.option("--layer", default=None, help="Layer (table) for GeoPackage")
+@click.option("--template-id", required=False, help="Template id to use")
+@click.option("--template-version", default=None, help="Specific template version")
+@click.option(
+    "--templates-dir",
+    multiple=True,
+    default=[],
+    help="Directory with templates (can be used multiple times). "
+    "Overrides DS_TEMPLATES_DIR and packaged defaults.",
+)
+@click.option(
+    "--template-schema",
+    default=None,
+    help="Path to template JSON-Schema (optional)",
+)
+@click.option("--report", default=None, help="Write JSON report to this path")
+@click.option(
+    "--print-json",
+    is_flag=True,
+    help="Print JSON report to stdout (in addition to text summary)",
+)
+@click.option(
+    "--list-templates",
+    is_flag=True,
+    help="List available templates and exit (no validation performed).",
+)
+@click.option(
+    "--quick-check-limit",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Stop the GeoPackage PRAGMA quick_check after this many problems.",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=None,
+    help="DuckDB worker threads (default: $DS_DUCKDB_THREADS, else all cores).",
+)
+@click.option(
+    "--memory-limit",
+    default=None,
+    help="DuckDB memory limit, e.g. '4GB' "
+    "(default: $DS_DUCKDB_MEM, else DuckDB's 80% of RAM).",
+)
+@click.option(
+    "--debug",
+    is_flag=True,
+    help="Print extra diagnostics (adapters).",
+)
+def main(
+    input_path: str | None,
+    input_glob: str | None,
+    fmt: str | None,
+    layer: str | None,
+    template_id: str | None,
+    template_version: str | None,
+    templates_dir: tuple[str, ...],
+    template_schema: str | None,
+    report: str | None,
+    print_json: bool,
+    list_templates: bool,
+    quick_check_limit: int,
+    threads: int | None,
+    memory_limit: str | None,
+    debug: bool,
+):
+    """
+    Template-driven, memory-safe validator for CSV/GeoParquet/GeoPackage/Shapefile.
+
+    Examples:
+      quap-validate --list-templates
+      quap-validate --input data.parquet --template-id lpis_population --print-json
+      quap-validate --input-glob 'deliveries/*.gpkg' --template-id gsa_population
+    """
+    if list_templates:
+        search_dirs = list(templates_dir or [])
+        raise SystemExit(_list_templates(search_dirs))
+
+    if not input_path and not input_glob:
+        raise click.UsageError(
+            "--input or --input-glob is required (unless you pass --list-templates)"
+        )
+    if not template_id:
+        raise click.UsageError(
+            "--template-id is required (unless you pass --list-templates)"
+        )
+
+    reg = TemplateRegistry(
+        list(templates_dir or []),
+        schema_path=(
+            template_schema
+            if template_schema and os.path.exists(template_schema)
+            else None
+        ),
+    )
+    tpl = reg.load(template_id, version=template_version)
+
+    try:
+        con = get_connection(threads=threads, memory_limit=memory_limit)
+    except ValueError as e:
+        raise click.UsageError(str(e))
     try:
-        con.close()
+        if not input_glob:
+            rep, diagnostics = _validate_input(
+                con, tpl, input_path, fmt, layer, quick_check_limit
+            )
+            _emit(rep, print_json, report, debug, diagnostics)
+            exit_code = rep.exit_code()
+        else:
+            paths = sorted(glob.glob(input_glob, recursive=True))
+            if not paths:
+                raise click.UsageError(f"No files match --input-glob {input_glob!r}")
+            root = _glob_root(input_glob)
+            codes = []
+            for path in paths:
+                reset_connection(con)
+                rep, diagnostics = _validate_input(
+                    con, tpl, path, fmt, layer, quick_check_limit
+                )
+                # Mirror the path below the glob root, so a/x.gpkg and b/x.gpkg
+                # from a recursive glob get distinct reports.
+                target = (
+                    os.path.join(report, os.path.relpath(path, root) + ".report.json")
+                    if report
+                    else None
+                )
+                _emit(rep, print_json, target, debug, diagnostics)
+                codes.append(rep.exit_code())
+            # Lowest non-zero code = most severe, same precedence as Report.exit_code.
+            exit_code = min((c for c in codes if c), default=0)
     finally:
-        try:
-            cleanup()
-        except Exception:
-            pass
+        # GeoPackage handles are reused across a batch; release them once.
+        close_gpkg_connections()
+        close_connection()
 
-    raise SystemExit(rep.exit_code())
+    raise SystemExit(exit_code)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import io
 import os
+import re
 import tarfile
 import zipfile
 import tempfile
@@ -9,6 +10,11 @@ import shutil
 import gzip, bz2, lzma
 from typing import Callable, Optional, Tuple, List
 
+try:  # optional ISA-L inflate, a drop-in for gzip.open and several times faster
+    from isal import igzip as _igzip
+except ImportError:  # pragma: no cover - depends on the environment
+    _igzip = None
+
 BASIC_ARCHIVE_EXTS = {
     ".zip",
     ".tar",
@@ -23,6 +29,10 @@ BASIC_ARCHIVE_EXTS = {
     ".xz",
 }
 
+# Copy buffer for streamed decompression: far fewer read()/write() calls than
+# shutil's 64 KiB default on multi-GB outputs.
+COPY_BUFSIZE = 4 * 1024 * 1024
+
 
 class UnpackError(Exception):
     pass
@@ -33,49 +43,58 @@ def _is_archive(path: Path) -> bool:
     return any(p.endswith(ext) for ext in BASIC_ARCHIVE_EXTS)
 
 
-def _safe_members_tar(tf: tarfile.TarFile) -> List[tarfile.TarInfo]:
-    safe = []
-    for m in tf.getmembers():
-        name = m.name
-        if name.startswith("/") or name.startswith("\\"):
-            raise UnpackError(f"Unsafe member path: {name}")
-        norm = os.path.normpath(name)
-        if norm.startswith("..") or "/../" in norm.replace("\\", "/"):
-            raise UnpackError(f"Unsafe member path: {name}")
-        safe.append(m)
-    return safe
+# Absolute member paths, or any ".." path component (after mapping "\\" to "/").
+_UNSAFE_MEMBER = re.compile(r"^/|(?:^|/)\.\.(?:/|$)")
 
 
-def _safe_namelist_zip(zf: zipfile.ZipFile) -> List[str]:
-    safe = []
-    for name in zf.namelist():
-        if name.startswith("/") or name.startswith("\\"):
+def _check_member_names(names: List[str]) -> None:
+    for name in names:
+        if _UNSAFE_MEMBER.search(name.replace("\\", "/")):
             raise UnpackError(f"Unsafe member path: {name}")
-        norm = os.path.normpath(name)
-        if norm.startswith("..") or "/../" in norm.replace("\\", "/"):
-            raise UnpackError(f"Unsafe member path: {name}")
-        safe.append(name)
-    return safe
 
 
-def _shapefile_dataset_root(paths: List[Path]) -> Optional[Path]:
-    """Return the stem if files constitute exactly one shapefile dataset; else None."""
-    shp_files = [p for p in paths if p.suffix.lower() == ".shp"]
+def _safe_members_tar(tf: tarfile.TarFile) -> List[tarfile.TarInfo]:
+    members = tf.getmembers()
+    _check_member_names([m.name for m in members])
+    return members
+
+
+def _safe_namelist_zip(zf: zipfile.ZipFile) -> List[str]:
+    names = zf.namelist()
+    _check_member_names(names)
+    return names
+
+
+def _walk_files(root: str) -> List[str]:
+    """Regular files under `root`; scandir's dirent types spare a stat() per entry."""
+    out = []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    out.append(entry.path)
+    return out
+
+
+def _shapefile_dataset_root(paths: List[str]) -> Optional[Path]:
+    """Return the .shp path if files constitute exactly one shapefile dataset; else None."""
+    shp_files = [p for p in paths if p.lower().endswith(".shp")]
     if len(shp_files) != 1:
         return None
-    stem = shp_files[0].with_suffix("")
-    siblings = [p for p in paths if p.with_suffix("") == stem]
-    if not any(p.suffix.lower() == ".dbf" for p in siblings):
-        return None
-    if not any(p.suffix.lower() == ".shx" for p in siblings):
+    stem = shp_files[0][: -len(".shp")]
+    sidecars = {p[len(stem) :].lower() for p in paths if p.startswith(stem + ".")}
+    if ".dbf" not in sidecars or ".shx" not in sidecars:
         return None
-    return shp_files[0]
+    return Path(shp_files[0])
 
 
 def _single_file_stream_decompress(src: Path, tmpdir: Path) -> Path:
     suffix = src.suffix.lower()
     if suffix == ".gz":
-        opener, strip = gzip.open, True
+        opener, strip = (_igzip.open if _igzip else gzip.open), True
     elif suffix == ".bz2":
         opener, strip = bz2.open, True
     elif suffix == ".xz":
@@ -87,7 +106,7 @@ def _single_file_stream_decompress(src: Path, tmpdir: Path) -> Path:
         out_name = "decompressed.bin"
     out_path = tmpdir / out_name
     with opener(src, "rb") as f_in, open(out_path, "wb") as f_out:
-        shutil.copyfileobj(f_in, f_out)
+        shutil.copyfileobj(f_in, f_out, length=COPY_BUFSIZE)
     return out_path
 
 
@@ -130,19 +149,18 @@ def maybe_decompress(input_path: str) -> Tuple[Path, Callable[[], None]]:
         tmpdir_obj.cleanup()
         raise UnpackError(f"Unsupported archive: {p.name}")
 
-    files = [q for q in tmpdir.rglob("*") if q.is_file()]
+    files = _walk_files(str(tmpdir))
     if not files:
         tmpdir_obj.cleanup()
         raise UnpackError("Archive contained no files.")
 
     if len(files) == 1:
-        return files[0], tmpdir_obj.cleanup
+        return Path(files[0]), tmpdir_obj.cleanup
 
     shp_root = _shapefile_dataset_root(files)
     if shp_root is not None:
         return shp_root, tmpdir_obj.cleanup
 
-    stems = sorted(set([f.name for f in files if f.parent == tmpdir]))
     raise UnpackError(
         "Archive contains multiple files and does not represent a single Shapefile bundle. "
         "Please provide an archive with exactly one dataset (e.g., a single .csv/.gpkg/.parquet, "
@@ -2,11 +2,178 @@
 
 from __future__ import annotations
 
+import atexit
+import os
+import shutil
+import tempfile
 import weakref
 
 import duckdb
 
 _SPATIAL_EXTENSION_LOADED: "weakref.WeakSet[duckdb.DuckDBPyConnection]" = weakref.WeakSet()
+_SQLITE_EXTENSION_LOADED: "weakref.WeakSet[duckdb.DuckDBPyConnection]" = weakref.WeakSet()
+# Extensions live on disk per process, not per connection: once ``spatial`` has
+# loaded or been installed here, later connections only need ``LOAD``.
+_SPATIAL_INSTALLED_ON_DISK = False
+
+_CONNECTION: duckdb.DuckDBPyConnection | None = None
+_SPILL_DIR: str | None = None
+
+
+def _spill_dir() -> str:
+    """Private spill directory for this process, removed at exit."""
+
+    global _SPILL_DIR
+    if _SPILL_DIR is None:
+        _SPILL_DIR = tempfile.mkdtemp(prefix="quap_validator_duckdb-")
+        atexit.register(shutil.rmtree, _SPILL_DIR, ignore_errors=True)
+    return _SPILL_DIR
+
+
+def configure_connection(
+    con: duckdb.DuckDBPyConnection,
+    *,
+    threads: int | None = None,
+    memory_limit: str | None = None,
+) -> None:
+    """Apply the settings validation runs use for scan-heavy workloads.
+
+    ``threads`` and ``memory_limit`` fall back to ``DS_DUCKDB_THREADS`` and
+    ``DS_DUCKDB_MEM`` (e.g. a container's cgroup limit) and are only set when
+    one of them is given; otherwise DuckDB's own defaults (all cores, 80% of
+    RAM) apply. Insertion order is not needed by any check, so it is disabled
+    to let loads and scans run unordered, and spills go to a private
+    per-process directory under the system temp dir. ``DS_DUCKDB_EXTENSION_DIR``
+    points DuckDB at a pre-bundled extension dir.
+
+    Raises ``ValueError`` if the thread count is not a positive integer.
+    """
+
+    threads = threads or os.getenv("DS_DUCKDB_THREADS") or None
+    if threads is not None:
+        try:
+            threads = int(threads)
+        except ValueError:
+            threads = 0
+        if threads < 1:
+            raise ValueError(
+                "DuckDB threads must be a positive integer "
+                "(check --threads / DS_DUCKDB_THREADS)"
+            )
+    memory_limit = memory_limit or os.getenv("DS_DUCKDB_MEM") or None
+    ext_dir = os.getenv("DS_DUCKDB_EXTENSION_DIR")
+    if ext_dir:
+        # Pre-bundled extensions (sqlite, spatial) avoid any network INSTALL.
+        con.execute("SET extension_directory = ?", [ext_dir])
+    if threads:
+        con.execute(f"SET threads = {threads}")
+    if memory_limit:
+        con.execute("SET memory_limit = ?", [memory_limit])
+    con.execute("SET preserve_insertion_order = false")
+    con.execute("SET temp_directory = ?", [_spill_dir()])
+
+
+def get_connection(
+    *,
+    threads: int | None = None,
+    memory_limit: str | None = None,
+) -> duckdb.DuckDBPyConnection:
+    """Return the process-wide connection, creating it on first use.
+
+    The first call connects, applies :func:`configure_connection` and loads
+    ``spatial`` if it is already on disk, so every later input (batch runs,
+    embedding callers) skips connection setup and the extension load.
+    ``threads``/``memory_limit`` only take effect on that first call. Call
+    :func:`close_connection` to release it.
+    """
+
+    global _CONNECTION, _SPATIAL_INSTALLED_ON_DISK
+    if _CONNECTION is None:
+        con = duckdb.connect()
+        try:
+            configure_connection(con, threads=threads, memory_limit=memory_limit)
+        except Exception:
+            con.close()
+            raise
+        try:
+            con.load_extension("spatial")
+        except duckdb.Error:
+            # Not on disk: ensure_spatial_extension installs it only if a
+            # geometry column actually needs it.
+            pass
+        else:
+            _SPATIAL_INSTALLED_ON_DISK = True
+            _mark_spatial_extension_loaded(con)
+        _CONNECTION = con
+    return _CONNECTION
+
+
+def close_connection() -> None:
+    """Close the connection returned by :func:`get_connection`, if any."""
+
+    global _CONNECTION
+    if _CONNECTION is not None:
+        _CONNECTION.close()
+        _CONNECTION = None
+
+
+def project_columns(
+    present: list[str], needed_cols: list[str] | None
+) -> tuple[list[str], str]:
+    """Return the ``needed_cols`` found in ``present`` and their SQL select list.
+
+    Restricting reader views to template columns lets DuckDB's Parquet/CSV
+    readers skip every other column instead of decoding it for each scan. With
+    nothing to project the select list is ``*`` and all ``present`` columns are
+    reported.
+    """
+
+    cols = [c for c in (needed_cols or []) if c in present]
+    if not cols:
+        return list(present), "*"
+    return cols, ", ".join(quote_ident(c) for c in cols)
+
+
+def reset_connection(con: duckdb.DuckDBPyConnection) -> None:
+    """Drop what loading one input left on ``con`` so the next input starts clean.
+
+    Detaches attached databases (e.g. the GeoPackage ``ATTACH``), drops user
+    views and temporary tables. Connection settings and loaded extensions are
+    kept, which is what makes reusing one connection across inputs cheap.
+    """
+
+    dbs = con.execute(
+        "SELECT database_name FROM duckdb_databases() "
+        "WHERE NOT internal AND database_name <> current_database()"
+    ).fetchall()
+    for (db,) in dbs:
+        con.execute(f"DETACH {quote_ident(db)}")
+    views = con.execute(
+        "SELECT database_name, schema_name, view_name FROM duckdb_views() "
+        "WHERE NOT internal"
+    ).fetchall()
+    for parts in views:
+        con.execute(f"DROP VIEW IF EXISTS {'.'.join(map(quote_ident, parts))}")
+    tables = con.execute(
+        "SELECT database_name, schema_name, table_name FROM duckdb_tables() "
+        "WHERE temporary"
+    ).fetchall()
+    for parts in tables:
+        con.execute(f"DROP TABLE IF EXISTS {'.'.join(map(quote_ident, parts))}")
+
+
+def quote_ident(name: str) -> str:
+    """Quote ``name`` as a SQL identifier (DuckDB and SQLite rules)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    """Quote ``value`` as a SQL string literal.
+
+    For statements DuckDB cannot prepare (``CREATE VIEW``, ``ATTACH``), where
+    file paths and user-supplied names must be inlined rather than bound.
+    """
+    return "'" + value.replace("'", "''") + "'"
 
 
 def ensure_spatial_extension(con: duckdb.DuckDBPyConnection) -> None:
@@ -19,24 +186,53 @@ def ensure_spatial_extension(con: duckdb.DuckDBPyConnection) -> None:
     per connection so subsequent calls are free.
     """
 
+    global _SPATIAL_INSTALLED_ON_DISK
+
     if _has_loaded_spatial_extension(con):
         return
 
+    if _SPATIAL_INSTALLED_ON_DISK:
+        con.load_extension("spatial")
+        _mark_spatial_extension_loaded(con)
+        return
+
     try:
         con.load_extension("spatial")
-    except duckdb.Error as load_err:
-        # ``LOAD`` can fail if the extension has not been installed yet. Try to
-        # install it and then attempt to load again, surfacing the original
-        # error if we still cannot load the extension afterwards.
+    except duckdb.IOException as load_err:
+        # ``LOAD`` raises IOException when the extension file is not on disk
+        # yet; only that case is worth an ``INSTALL``. Other errors (e.g. a
+        # version mismatch) propagate directly. If loading still fails after
+        # installing, the original error is chained to the new one.
         con.install_extension("spatial")
         try:
             con.load_extension("spatial")
         except duckdb.Error as second_err:  # pragma: no cover - defensive branch
             raise second_err from load_err
 
+    _SPATIAL_INSTALLED_ON_DISK = True
     _mark_spatial_extension_loaded(con)
 
 
+def ensure_sqlite_extension(con: duckdb.DuckDBPyConnection) -> None:
+    """Ensure the DuckDB ``sqlite`` (sqlite_scanner) extension is loaded on ``con``.
+
+    ``LOAD`` is tried first so an extension already on disk never triggers an
+    ``INSTALL`` (which may hit the network); the result is cached per connection.
+    """
+
+    if con in _SQLITE_EXTENSION_LOADED:
+        return
+
+    try:
+        con.load_extension("sqlite")
+    except duckdb.IOException:
+        # Not on disk yet; any other load failure is a real error.
+        con.install_extension("sqlite")
+        con.load_extension("sqlite")
+
+    _SQLITE_EXTENSION_LOADED.add(con)
+
+
 def _has_loaded_spatial_extension(con: duckdb.DuckDBPyConnection) -> bool:
     """Return ``True`` if ``ensure_spatial_extension`` has been run for ``con``."""
 
@@ -55,7 +251,9 @@ def _mark_spatial_extension_loaded(con: duckdb.DuckDBPyConnection) -> None:
 
     try:
         _SPATIAL_EXTENSION_LOADED.add(con)
+        return
     except TypeError:
+        # Not weak-referenceable; fall back to tagging the object itself.
         pass
 
     try:
@@ -63,4 +261,3 @@ def _mark_spatial_extension_loaded(con: duckdb.DuckDBPyConnection) -> None:
     except AttributeError:
         # ``DuckDBPyConnection`` objects do not allow setting custom attributes.
         pass
-
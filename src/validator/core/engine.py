@@ -2,7 +2,8 @@ from __future__ import annotations
 import duckdb, sqlite3, time
 from typing import Iterable
 
-from validator.core.duck import ensure_spatial_extension
+from validator.core.duck import ensure_spatial_extension, quote_ident
+
 DUCK_TYPES = {
     "int64": "BIGINT",
     "float64": "DOUBLE",
@@ -13,55 +14,204 @@ DUCK_TYPES = {
 }
 
 
-def _qi(name: str) -> str:
-    return '"' + name.replace('"', '""') + '"'
+# Enums with at least this many values are checked with a hash join against
+# the bound list; below it a literal IN list is cheaper.
+ENUM_SEMI_JOIN_MIN = 8
+
+
+_INT_TYPES = {
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+}
+
+# Storage types whose non-null values always cast to the target type; a
+# TRY_CAST check over them can never fail, so it is skipped.
+_ALWAYS_CASTS_TO = {
+    "BIGINT": _INT_TYPES,
+    "DOUBLE": _INT_TYPES | {"UBIGINT", "HUGEINT", "FLOAT", "DOUBLE"},
+    "BOOLEAN": {"BOOLEAN"},
+    "DATE": {"DATE"},
+    "TIMESTAMP": {"TIMESTAMP", "TIMESTAMP_S", "TIMESTAMP_MS", "TIMESTAMP_NS"},
+}
+
 
+def _always_casts(duck_type: str | None, target: str) -> bool:
+    if not duck_type:
+        return False
+    if target == "VARCHAR":
+        return True
+    if target == "DOUBLE" and duck_type.startswith("DECIMAL"):
+        return True
+    return duck_type in _ALWAYS_CASTS_TO.get(target, ())
 
-def _sql_quote(s: str) -> str:
-    return "'" + s.replace("'", "''") + "'"
+
+# SQL fragment plus the values bound to its `?` placeholders, in order.
+Predicate = tuple[str, list]
 
 
 def _null_predicate(
     col: str, duck_type: str | None, null_equivalents: list | None
-) -> str:
-    base = f"{_qi(col)} IS NULL"
+) -> Predicate:
+    base = f"{quote_ident(col)} IS NULL"
     if not null_equivalents or (duck_type and duck_type.upper() != "VARCHAR"):
-        return base
+        return base, []
     str_vals = [v for v in null_equivalents if isinstance(v, str)]
     if not str_vals:
-        return base
-    eqs = " OR ".join(f"{_qi(col)}={_sql_quote(v)}" for v in str_vals)
-    return f"{base} OR {eqs}"
+        return base, []
+    eqs = " OR ".join(f"{quote_ident(col)} = ?" for _ in str_vals)
+    return f"{base} OR {eqs}", str_vals
 
 
 def _nonnull_predicate(
     col: str, duck_type: str | None, null_equivalents: list | None
-) -> str:
-    return f"NOT ({_null_predicate(col, duck_type, null_equivalents)})"
-
-
-def _bad_cast_count(
-    con, view, col, logical_type, duck_type, null_equivalents: list[str] | None
-):
+) -> Predicate:
+    sql, params = _null_predicate(col, duck_type, null_equivalents)
+    return f"NOT ({sql})", params
+
+
+def _bad_cast_predicate(
+    col,
+    logical_type,
+    duck_type,
+    null_equivalents: list[str] | None,
+    nonnull: Predicate | None = None,
+) -> Predicate | None:
+    """
+    Predicate matching non-null values that do not cast to the logical type.
+    `nonnull` may pass an already built _nonnull_predicate for the column.
+    """
     if logical_type == "geometry":
-        return 0
+        return None
     t = DUCK_TYPES.get(logical_type)
-    if not t:
-        return 0
-    nonnull = _nonnull_predicate(col, duck_type, null_equivalents)
-    q = f"""
-        SELECT COUNT(*) FROM {_qi(view)}
-        WHERE {nonnull}
-          AND TRY_CAST({_qi(col)} AS {t}) IS NULL
-    """
-    return con.execute(q).fetchone()[0]
+    if not t or _always_casts(duck_type, t):
+        return None
+    nonnull, params = nonnull or _nonnull_predicate(col, duck_type, null_equivalents)
+    return f"({nonnull}) AND TRY_CAST({quote_ident(col)} AS {t}) IS NULL", params
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
 
 
-def _dup_examples(con, view, keys: list[str], limit: int):
-    k_list = ", ".join(_qi(k) for k in keys)
-    q = f"SELECT {k_list}, COUNT(*) AS count FROM {_qi(view)} GROUP BY {k_list} HAVING count>1 LIMIT {limit}"
-    rows = con.execute(q).fetchall()
-    return [dict(zip(keys + ["count"], row)) for row in rows]
+def _enum_text(v) -> str:
+    # Match DuckDB's CAST(... AS VARCHAR) spelling of booleans.
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return str(v)
+
+
+def _enum_not_in(qcol: str, duck_type: str | None, values: list) -> Predicate:
+    """
+    `NOT IN` predicate for an enum check. Bound values are typed from Python,
+    not from the column, so they are only compared natively when both sides
+    are numeric (or both boolean); otherwise both sides compare as VARCHAR.
+    """
+    t = (duck_type or "").upper()
+    numeric_col = t.startswith("DECIMAL") or t in _ALWAYS_CASTS_TO["DOUBLE"]
+    if values and (
+        (numeric_col and all(map(_is_number, values)))
+        or (t == "BOOLEAN" and all(isinstance(v, bool) for v in values))
+    ):
+        lhs, params, list_type = qcol, list(values), ""
+    else:
+        lhs = qcol if t == "VARCHAR" else f"CAST({qcol} AS VARCHAR)"
+        params, list_type = [_enum_text(v) for v in values], "::VARCHAR[]"
+    if not params:
+        return "TRUE", []  # an empty enum admits no value
+    if len(params) >= ENUM_SEMI_JOIN_MIN:
+        # Bound as one list: DuckDB plans the subquery as a hash join,
+        # instead of a per-row comparison against every literal.
+        return f"{lhs} NOT IN (SELECT unnest(?{list_type}))", [params]
+    placeholders = ", ".join("?" for _ in params)
+    return f"{lhs} NOT IN ({placeholders})", params
+
+
+def _count_where(
+    con,
+    view: str,
+    predicates: list[Predicate],
+    distinct_keys: list[list[str]] | None = None,
+) -> tuple[int, list[int], list[int]]:
+    """
+    Single scan of `view` returning (row count, rows matching each predicate,
+    distinct key tuples for each key set in `distinct_keys`).
+    """
+    aggs = [
+        "COUNT(*)",
+        *(f"COUNT(*) FILTER (WHERE {sql})" for sql, _ in predicates),
+        # ROW(...) keeps NULL keys as one distinct value, matching GROUP BY.
+        *(
+            f"COUNT(DISTINCT ROW({', '.join(map(quote_ident, k))}))"
+            for k in distinct_keys or []
+        ),
+    ]
+    params = [v for _, p in predicates for v in p]
+    aggs_sql = ",\n  ".join(aggs)
+    row = con.execute(
+        f"SELECT\n  {aggs_sql}\nFROM {quote_ident(view)}", params
+    ).fetchone()
+    n = len(predicates)
+    return row[0], list(row[1 : 1 + n]), list(row[1 + n :])
+
+
+def _describe(con, view: str) -> list[tuple[str, str]]:
+    """(name, type) for each column of `view`, read from the relation API (no query runs)."""
+    rel = con.table(view)
+    return list(zip(rel.columns, map(str, rel.types)))
+
+
+def _dup_examples(con, view, rules: list[tuple[list[str], int]]) -> list[list[dict]]:
+    """
+    Up to `limit` duplicated key tuples (with their counts) for each
+    (keys, limit) rule, grouping on every key set in one GROUPING SETS scan.
+    """
+    all_keys = list(dict.fromkeys(k for keys, _ in rules for k in keys))
+    n = len(all_keys)
+    # GROUPING(all keys) has a bit set for each column *not* in the grouping set,
+    # most significant bit first; it identifies which key set a row belongs to.
+    set_ids: dict[frozenset, int] = {}
+    limits: dict[int, int] = {}
+    for keys, limit in rules:
+        gid = sum(1 << (n - 1 - i) for i, k in enumerate(all_keys) if k not in keys)
+        set_ids[frozenset(keys)] = gid
+        limits[gid] = max(limits.get(gid, 0), int(limit))
+
+    k_all = ", ".join(quote_ident(k) for k in all_keys)
+    grouping_sets = ", ".join(
+        "(" + ", ".join(quote_ident(k) for k in all_keys if k in key_set) + ")"
+        for key_set in set_ids
+    )
+    limit_case = " ".join("WHEN ? THEN ?" for _ in limits)
+    q = f"""
+        SELECT * FROM (
+          SELECT GROUPING({k_all}) AS _gid, {k_all}, COUNT(*) AS _count
+          FROM {quote_ident(view)}
+          GROUP BY GROUPING SETS ({grouping_sets})
+          HAVING COUNT(*) > 1
+        )
+        QUALIFY row_number() OVER (PARTITION BY _gid) <= CASE _gid {limit_case} END
+    """
+    params = [v for gid, limit in limits.items() for v in (gid, limit)]
+    rows = con.execute(q, params).fetchall()
+
+    by_gid: dict[int, list[tuple]] = {}
+    for row in rows:
+        by_gid.setdefault(row[0], []).append(row)
+    out = []
+    for keys, limit in rules:
+        idx = [1 + all_keys.index(k) for k in keys]
+        out.append(
+            [
+                {**{k: row[i] for k, i in zip(keys, idx)}, "count": row[-1]}
+                for row in by_gid.get(set_ids[frozenset(keys)], [])[: int(limit)]
+            ]
+        )
+    return out
 
 
 def validate_with_duckdb(
@@ -70,14 +220,16 @@ def validate_with_duckdb(
     t0 = time.time()
     result = {"ok": True, "errors": [], "warnings": [], "metrics": {}}
 
-    cols = con.execute(f"DESCRIBE {_qi(table_view)}").fetchall()
+    cols = _describe(con, table_view)
     present = [c[0] for c in cols]
     duck_types_by_col = {c[0]: (c[1] or "").upper() for c in cols}
+    present_set = set(present)
 
     expected = [c["name"] for c in template["columns"]]
-    missing = [c for c in expected if c not in present]
+    expected_set = set(expected)
+    missing = [c for c in expected if c not in present_set]
     extra = (
-        [c for c in present if c not in expected]
+        [c for c in present if c not in expected_set]
         if not template.get("allow_extra_columns", True)
         else []
     )
@@ -92,62 +244,99 @@ def validate_with_duckdb(
 
     unknown_dtype_issues = []
 
+    # Collect every per-column check as (kind, column spec, predicate) and count
+    # them all in one aggregate query: one scan of the view instead of ~4 per column.
+    # DuckDB already spreads that scan over its worker threads. Fanning queries
+    # out to con.cursor() threads is not an option: cursors are separate
+    # connections and cannot see the TEMP tables the adapters load into.
+    checks: list[tuple[str, dict, Predicate]] = []
     for col_spec in template["columns"]:
         col = col_spec["name"]
-        if col not in present:
+        if col not in present_set:
             continue
         duck_type = duck_types_by_col.get(col)
-
+        # Quoted name and null predicates are shared by all checks on the column.
+        qcol = quote_ident(col)
         null_pred = _null_predicate(col, duck_type, null_equiv)
-        n_null = con.execute(
-            f"SELECT COUNT(*) FROM {_qi(table_view)} WHERE {null_pred}"
-        ).fetchone()[0]
-        nulls[col] = n_null
+        nonnull, nonnull_params = f"NOT ({null_pred[0]})", null_pred[1]
+
+        checks.append(("null", col_spec, null_pred))
 
         logical = col_spec["dtype"]
         if logical not in DUCK_TYPES:
             unknown_dtype_issues.append({"column": col, "dtype": logical})
         else:
-            bad = _bad_cast_count(con, table_view, col, logical, duck_type, null_equiv)
-            if bad > 0:
-                mism.append({"column": col, "expected": logical, "invalid_rows": bad})
-
-        if "enum" in col_spec and col in present:
-            enum_vals_sql = ", ".join(
-                [
-                    _sql_quote(v) if isinstance(v, str) else str(v)
-                    for v in col_spec["enum"]
-                ]
+            bad_pred = _bad_cast_predicate(
+                col, logical, duck_type, null_equiv, (nonnull, nonnull_params)
             )
-            nonnull = _nonnull_predicate(col, duck_type, null_equiv)
-            q = f"SELECT COUNT(*) FROM {_qi(table_view)} WHERE {nonnull} AND {_qi(col)} NOT IN ({enum_vals_sql})"
-            bad_enum = con.execute(q).fetchone()[0]
-            if bad_enum > 0:
-                result["errors"].append(
-                    {"code": "ENUM_VIOLATION", "column": col, "invalid_rows": bad_enum}
+            if bad_pred:
+                checks.append(("cast", col_spec, bad_pred))
+
+        if "enum" in col_spec:
+            not_in, enum_params = _enum_not_in(qcol, duck_type, col_spec["enum"])
+            checks.append(
+                (
+                    "enum",
+                    col_spec,
+                    (f"({nonnull}) AND {not_in}", [*nonnull_params, *enum_params]),
                 )
+            )
 
-        if "range" in col_spec and col in present and logical in DUCK_TYPES:
+        if "range" in col_spec and logical in DUCK_TYPES:
             t = DUCK_TYPES[logical]
             rng = col_spec["range"]
-            nonnull = _nonnull_predicate(col, duck_type, null_equiv)
-            min_clause = (
-                f"CAST({_qi(col)} AS {t}) < {rng['min']}" if "min" in rng else "FALSE"
-            )
-            max_clause = (
-                f"CAST({_qi(col)} AS {t}) > {rng['max']}" if "max" in rng else "FALSE"
+            # TRY_CAST: values that do not cast are reported as DTYPE_MISMATCH
+            # and must not abort the shared aggregate query. Natively stored
+            # numeric/temporal columns are compared as they are.
+            if t != "VARCHAR" and _always_casts(duck_type, t):
+                value = qcol
+            else:
+                value = f"TRY_CAST({qcol} AS {t})"
+            bounds = []
+            min_clause = max_clause = "FALSE"
+            if "min" in rng:
+                min_clause = f"{value} < ?"
+                bounds.append(rng["min"])
+            if "max" in rng:
+                max_clause = f"{value} > ?"
+                bounds.append(rng["max"])
+            checks.append(
+                (
+                    "range",
+                    col_spec,
+                    (
+                        f"({nonnull}) AND (({min_clause}) OR ({max_clause}))",
+                        [*nonnull_params, *bounds],
+                    ),
+                )
             )
-            bad_range = con.execute(
-                f"SELECT COUNT(*) FROM {_qi(table_view)} WHERE {nonnull} AND (({min_clause}) OR ({max_clause}))"
-            ).fetchone()[0]
-            if bad_range > 0:
-                result["errors"].append(
-                    {
-                        "code": "RANGE_VIOLATION",
-                        "column": col,
-                        "invalid_rows": bad_range,
-                    }
+
+    # Duplicate rules whose keys exist get a COUNT(DISTINCT ...) in the same scan;
+    # the GROUP BY for examples only runs for rules that actually have duplicates.
+    dup_checks = [
+        d
+        for d in template.get("duplicate_checks", [])
+        if present_set.issuperset(d["keys"])
+    ]
+    row_count, counts, distinct_counts = _count_where(
+        con,
+        table_view,
+        [pred for _, _, pred in checks],
+        [d["keys"] for d in dup_checks],
+    )
+    result["row_count"] = row_count
+    for (kind, col_spec, _), n in zip(checks, counts):
+        col = col_spec["name"]
+        if kind == "null":
+            nulls[col] = n
+        elif kind == "cast":
+            if n > 0:
+                mism.append(
+                    {"column": col, "expected": col_spec["dtype"], "invalid_rows": n}
                 )
+        elif n > 0:
+            code = "ENUM_VIOLATION" if kind == "enum" else "RANGE_VIOLATION"
+            result["errors"].append({"code": code, "column": col, "invalid_rows": n})
 
     if unknown_dtype_issues:
         result["errors"].append(
@@ -160,7 +349,7 @@ def validate_with_duckdb(
     result["metrics"]["nulls"] = nulls
 
     for col_spec in template["columns"]:
-        if col_spec.get("required") and col_spec["name"] in present:
+        if col_spec.get("required") and col_spec["name"] in present_set:
             if nulls.get(col_spec["name"], 0) > 0:
                 result["errors"].append(
                     {
@@ -170,14 +359,21 @@ def validate_with_duckdb(
                     }
                 )
 
-    for d in template.get("duplicate_checks", []):
-        keys = d["keys"]
-        if all(k in present for k in keys):
-            examples = _dup_examples(con, table_view, keys, d.get("sample_limit", 1000))
+    # Examples are only fetched for rules that have duplicates, all in one scan.
+    dup_rules = [
+        d for d, n_distinct in zip(dup_checks, distinct_counts) if n_distinct != row_count
+    ]
+    if dup_rules:
+        all_examples = _dup_examples(
+            con,
+            table_view,
+            [(d["keys"], d.get("sample_limit", 1000)) for d in dup_rules],
+        )
+        for d, examples in zip(dup_rules, all_examples):
             if examples:
                 sev = d.get("severity", "error")
                 (result["errors"] if sev == "error" else result["warnings"]).append(
-                    {"code": "DUPLICATES", "keys": keys, "examples": examples}
+                    {"code": "DUPLICATES", "keys": d["keys"], "examples": examples}
                 )
 
     result["timing_sec"] = round(time.time() - t0, 3)
@@ -185,18 +381,24 @@ def validate_with_duckdb(
     return result
 
 
-def _pick_existing_column(
-    con, table_name: str, candidates: list[str]
-) -> tuple[str | None, str | None]:
+def _column_types(con, table_name: str) -> dict[str, str]:
     rows = con.execute(
         """
-        SELECT lower(column_name) AS name, column_type
+        SELECT lower(column_name) AS name, data_type
         FROM duckdb_columns()
         WHERE lower(table_name) = lower(?)
         """,
         [table_name],
     ).fetchall()
-    cols = {r[0]: r[1] for r in rows}
+    return {r[0]: r[1] for r in rows}
+
+
+def _pick_existing_column(
+    con, table_name: str, candidates: list[str], cols: dict[str, str] | None = None
+) -> tuple[str | None, str | None]:
+    """First candidate present in `table_name`; pass `cols` to reuse a catalog lookup."""
+    if cols is None:
+        cols = _column_types(con, table_name)
     for c in candidates:
         lc = c.lower()
         if lc in cols:
@@ -211,33 +413,38 @@ def ensure_geometry_alias(
     canonical_name: str,
     aliases: list[str],
 ):
-    name, ctype = _pick_existing_column(con, in_view, [canonical_name])
+    cols = _column_types(con, in_view)
+    name, ctype = _pick_existing_column(con, in_view, [canonical_name], cols)
     if name is not None:
-        con.execute(f"CREATE OR REPLACE VIEW {out_view} AS SELECT * FROM {in_view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(out_view)} AS SELECT * FROM {quote_ident(in_view)}"
+        )
         return
 
-    src, src_type = _pick_existing_column(con, in_view, aliases)
+    src, src_type = _pick_existing_column(con, in_view, aliases, cols)
     if src is None:
-        con.execute(f"CREATE OR REPLACE VIEW {out_view} AS SELECT * FROM {in_view}")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {quote_ident(out_view)} AS SELECT * FROM {quote_ident(in_view)}"
+        )
         return
 
-    src_lc = src.lower()
-    geom_expr = src_lc
+    src_id = quote_ident(src)
+    geom_expr = src_id
     t = (src_type or "").upper()
     if t in ("BLOB", "VARBINARY"):
-        geom_expr = f"ST_GeomFromWKB({src_lc})"
+        geom_expr = f"ST_GeomFromWKB({src_id})"
     elif t in ("VARCHAR", "TEXT"):
-        geom_expr = f"ST_GeomFromText({src_lc})"
+        geom_expr = f"ST_GeomFromText({src_id})"
 
-    if geom_expr != src_lc:
+    if geom_expr != src_id:
         ensure_spatial_extension(con)
 
     con.execute(
         f"""
-        CREATE OR REPLACE VIEW {out_view} AS
+        CREATE OR REPLACE VIEW {quote_ident(out_view)} AS
         SELECT
           *,
-          {geom_expr} AS {canonical_name}
-        FROM {in_view}
+          {geom_expr} AS {quote_ident(canonical_name)}
+        FROM {quote_ident(in_view)}
         """
     )
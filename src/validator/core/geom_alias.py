@@ -34,11 +34,14 @@ def guess_canonical_by_columns(present_cols: dict[str, str]) -> Optional[str]:
         return "gsa_geom"
     if "gem" in present_cols:
         return "gsa_geom"
-    if any(k.startswith("gsa_") for k in present_cols):
-        return "gsa_geom"
-    if any(k.startswith("lpis_") for k in present_cols):
-        return "lpis_geom"
-    return None
+    # One pass over the columns; a gsa_ prefix wins over lpis_.
+    has_lpis = False
+    for k in present_cols:
+        if k.startswith("gsa_"):
+            return "gsa_geom"
+        if not has_lpis and k.startswith("lpis_"):
+            has_lpis = True
+    return "lpis_geom" if has_lpis else None
 
 
 def normalize_geometry_view(
@@ -4,26 +4,42 @@ import time
 
 
 class ProgressBar:
-    def __init__(self, total: int, prefix: str = "", length: int = 40):
-        self.start = time.time()
+    def __init__(
+        self,
+        total: int,
+        prefix: str = "",
+        length: int = 40,
+        render_interval: float = 0.05,
+    ):
+        self.start = time.perf_counter()
         self.total = total
         self.prefix = prefix
         self.length = length
         self.current = 0
+        # Redraw at most every `render_interval` seconds (and on completion);
+        # per-step writes dominate when update(1) is called per row.
+        self._render_interval = render_interval
+        self._last_render = float("-inf")
 
     def update(self, step: int = 1, message: str = ""):
         """Advance the progress bar by `step`."""
         self.current += step
+        now = time.perf_counter()
+        done = self.current >= self.total
+        if not done and now - self._last_render < self._render_interval:
+            return
+        self._last_render = now
         progress = self.current / self.total
         filled = int(self.length * progress)
         bar = "█" * filled + "-" * (self.length - filled)
-        elapsed = time.time() - self.start
+        elapsed = now - self.start
+        # \r never triggers a line-buffered flush, so flush explicitly.
         sys.stdout.write(
             f"\r{self.prefix} |{bar}| {self.current}/{self.total} "
             f"{message:<20} ({elapsed:5.1f}s)"
         )
         sys.stdout.flush()
-        if self.current >= self.total:
+        if done:
             self.finish()
 
     def finish(self):
@@ -2,8 +2,13 @@ from __future__ import annotations
 import os
 import json
 import datetime as _dt
-from dataclasses import dataclass, field, asdict
-from typing import Any, Dict, List, Optional, Literal
+from dataclasses import dataclass, field, asdict, is_dataclass
+from typing import Any, Dict, List, Optional, Literal, TypedDict
+
+try:  # optional: several times faster than json for report-shaped dicts
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 Severity = Literal["error", "warning", "info"]
 
@@ -50,17 +55,28 @@ class Provenance:
     run_id: Optional[str] = None
 
 
-@dataclass
-class Issue:
+class Issue(TypedDict):
+    """
+    Shape of one report issue. Issues are kept as plain dicts: reports can
+    carry thousands of duplicate examples, and serializing dicts skips a
+    dataclass round trip per issue.
+    """
+
     code: str
-    severity: Severity = "error"
-    detail: Optional[str] = None
-    column: Optional[str] = None
-    columns: Optional[List[str]] = None
-    keys: Optional[List[str]] = None
-    invalid_rows: Optional[int] = None
-    examples: Optional[List[Dict[str, Any]]] = None
-    extra: Dict[str, Any] = field(default_factory=dict)
+    severity: Severity
+    detail: Optional[str]
+    column: Optional[str]
+    columns: Optional[List[str]]
+    keys: Optional[List[str]]
+    invalid_rows: Optional[int]
+    examples: Optional[List[Dict[str, Any]]]
+    extra: Dict[str, Any]
+
+
+# Engine issue keys that map onto Issue fields; any other key goes to `extra`.
+_ISSUE_KEYS = frozenset(
+    ("code", "detail", "column", "columns", "keys", "invalid_rows", "examples")
+)
 
 
 @dataclass
@@ -82,29 +98,17 @@ class Report:
     infos: List[Issue] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
-        def _conv(obj):
-            if hasattr(obj, "__dataclass_fields__"):
-                return {k: _conv(v) for k, v in asdict(obj).items()}
-            if isinstance(obj, list):
-                return [_conv(x) for x in obj]
-            if isinstance(obj, dict):
-                return {k: _conv(v) for k, v in obj.items()}
-            return obj
-
-        return _conv(self)
+        # asdict already recurses into nested dataclasses, lists and dicts.
+        return asdict(self)
 
     def to_json(self, indent: Optional[int] = 2) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+        return _dumps(self, indent=indent)
 
     def write_json(self, path: str, indent: Optional[int] = 2) -> None:
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(self.to_json(indent=indent))
+        _write(path, self, indent=indent)
 
     def write_ndjson(self, path: str) -> None:
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
+        _write(path, self, indent=None, newline=True)
 
     def severity_counts(self) -> Dict[str, int]:
         return {
@@ -114,7 +118,7 @@ class Report:
         }
 
     def exit_code(self) -> int:
-        codes = [i.code for i in self.errors]
+        codes = [i["code"] for i in self.errors]
         if ISSUE["CORRUPTED_FILE"] in codes:
             return EXIT_CORRUPTED
         if ISSUE["MISSING_COLUMNS"] in codes:
@@ -132,8 +136,63 @@ class Report:
 
 
 # ---- Helpers ----------------------------------------------------------------
+def _orjson_bytes(obj: Any, indent: Optional[int]) -> Optional[bytes]:
+    """
+    Encode with orjson when installed (it only indents by 2). Dataclasses are
+    serialized natively, without the intermediate dict copy asdict makes.
+    Returns None when orjson cannot be used.
+    """
+    if orjson is None or indent not in (None, 2):
+        return None
+    opts = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if indent:
+        opts |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, option=opts)
+    except TypeError:
+        return None  # a type orjson does not know; let json report or handle it
+
+
+def _plain(obj: Any) -> Any:
+    return asdict(obj) if is_dataclass(obj) and not isinstance(obj, type) else obj
+
+
+def _dumps(obj: Any, indent: Optional[int] = 2) -> str:
+    """JSON-encode via orjson when installed, else json."""
+    data = _orjson_bytes(obj, indent)
+    if data is not None:
+        return data.decode("utf-8")
+    return json.dumps(_plain(obj), ensure_ascii=False, indent=indent)
+
+
+def write_text(path: str, text: str) -> None:
+    """Write already-encoded report text (e.g. `Report.to_json()`) to `path`."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write(path: str, obj: Any, indent: Optional[int], newline: bool = False) -> None:
+    """
+    Write `obj` as JSON to `path`. orjson output is written as bytes, as
+    encoded; the stdlib encoder streams into the file instead of building the
+    whole document as one string first.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    data = _orjson_bytes(obj, indent)
+    if data is not None:
+        with open(path, "wb") as f:
+            f.write(data + b"\n" if newline else data)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_plain(obj), f, ensure_ascii=False, indent=indent)
+        if newline:
+            f.write("\n")
+
+
 def _now_iso() -> str:
-    return _dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    now = _dt.datetime.now(_dt.timezone.utc).replace(microsecond=0)
+    return now.isoformat().replace("+00:00", "Z")
 
 
 def redact_path(p: str) -> str:
@@ -166,42 +225,27 @@ def build_report(
       - summary: Optional[Dict]
       - infos: Optional[List[Dict]]
     """
-    started = started_at or _now_iso()
     finished = _now_iso()
+    started = started_at or finished
     duration = float(engine_result.get("timing_sec") or 0.0)
 
     def _coerce_issues(
         items: List[Dict[str, Any]] | None, sev: Severity
     ) -> List[Issue]:
-        res = []
-        for it in items or []:
-            res.append(
-                Issue(
-                    code=str(it.get("code")),
-                    severity=sev,
-                    detail=it.get("detail"),
-                    column=it.get("column"),
-                    columns=it.get("columns"),
-                    keys=it.get("keys"),
-                    invalid_rows=it.get("invalid_rows"),
-                    examples=it.get("examples"),
-                    extra={
-                        k: v
-                        for k, v in it.items()
-                        if k
-                        not in {
-                            "code",
-                            "detail",
-                            "column",
-                            "columns",
-                            "keys",
-                            "invalid_rows",
-                            "examples",
-                        }
-                    },
-                )
-            )
-        return res
+        return [
+            {
+                "code": str(it.get("code")),
+                "severity": sev,
+                "detail": it.get("detail"),
+                "column": it.get("column"),
+                "columns": it.get("columns"),
+                "keys": it.get("keys"),
+                "invalid_rows": it.get("invalid_rows"),
+                "examples": it.get("examples"),
+                "extra": {k: v for k, v in it.items() if k not in _ISSUE_KEYS},
+            }
+            for it in items or []
+        ]
 
     report = Report(
         ok=bool(engine_result.get("ok", False)),
@@ -237,12 +281,12 @@ def render_text(report: Report) -> str:
     def _sample_issues(items: List[Issue], n=3) -> List[str]:
         out = []
         for i in items[:n]:
-            if i.columns:
-                out.append(f"{i.code}({','.join(i.columns)})")
-            elif i.column:
-                out.append(f"{i.code}({i.column})")
+            if i["columns"]:
+                out.append(f"{i['code']}({','.join(i['columns'])})")
+            elif i["column"]:
+                out.append(f"{i['code']}({i['column']})")
             else:
-                out.append(i.code)
+                out.append(i["code"])
         if len(items) > n:
             out.append(f"... +{len(items)-n} more")
         return out
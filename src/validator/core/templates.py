@@ -1,11 +1,32 @@
 from __future__ import annotations
 import json
 import os
-import glob
-from typing import List, Dict, Optional, Tuple
-from jsonschema import Draft202012Validator
+from typing import Any, List, Dict, Optional, Tuple
 from importlib.resources import files as pkg_files
 
+try:  # optional: lets directory scans read template headers without full parses
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+# Compiled validators keyed by (schema path, mtime, size): registries created
+# for the same schema file share one validator and its resolved $refs.
+_VALIDATOR_CACHE: Dict[tuple, Tuple[dict, Any]] = {}
+
+
+def _load_validator(schema_path: str) -> Tuple[dict, Any]:
+    st = os.stat(schema_path)
+    key = (os.path.abspath(schema_path), st.st_mtime_ns, st.st_size)
+    cached = _VALIDATOR_CACHE.get(key)
+    if cached is None:
+        # jsonschema costs ~40 ms to import; only pay it when a schema is used.
+        from jsonschema import Draft202012Validator
+
+        with open(schema_path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+        cached = _VALIDATOR_CACHE[key] = (schema, Draft202012Validator(schema))
+    return cached
+
 
 class TemplateRegistry:
     """
@@ -41,10 +62,9 @@ class TemplateRegistry:
         self.schema = None
         self.validator = None
         if schema_path and os.path.exists(schema_path):
-            with open(schema_path, "r", encoding="utf-8") as f:
-                self.schema = json.load(f)
-            self.validator = Draft202012Validator(self.schema)
+            self.schema, self.validator = _load_validator(schema_path)
 
+        self._parse_cache: Dict[str, Tuple[tuple, dict]] = {}
         self._indices: Dict[str, dict] = {}
         for d in self.search_dirs:
             idx = os.path.join(d, "index.json")
@@ -64,10 +84,16 @@ class TemplateRegistry:
         for d in self.search_dirs:
             if not d or not os.path.isdir(d):
                 continue
-            for p in glob.glob(os.path.join(d, "*.json")):
-                name = os.path.basename(p).lower()
-                if name == "index.json":
-                    continue
+            # One readdir per directory; unlike glob, no stat per match.
+            with os.scandir(d) as it:
+                paths = sorted(
+                    e.path
+                    for e in it
+                    if e.name.lower().endswith(".json")
+                    and e.name.lower() != "index.json"
+                    and e.is_file()
+                )
+            for p in paths:
                 if p not in seen:
                     seen.add(p)
                     out.append(p)
@@ -108,14 +134,49 @@ class TemplateRegistry:
                 return p
         return None
 
-    @staticmethod
-    def _parse_json(path: str) -> Optional[dict]:
+    def _parse_json(self, path: str) -> Optional[dict]:
+        """
+        Parse a template file, reusing the previous parse while the file is
+        unchanged. The returned object is the cached one: treat it as
+        read-only (_finalize copies it before annotating).
+        """
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+            cached = self._parse_cache.get(path)
+            if cached is None or cached[0] != key:
+                with open(path, "r", encoding="utf-8") as f:
+                    cached = self._parse_cache[path] = (key, json.load(f))
+            return cached[1]
         except Exception:
             return None
 
+    def _peek_header(self, path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (template_id, version) of a template file. With ijson installed
+        only the tokens up to both top-level keys are read; otherwise this
+        reads the two keys off the cached full parse, without copying it.
+        """
+        if ijson is None or path in self._parse_cache:
+            obj = self._parse_json(path)
+            if not isinstance(obj, dict):
+                return None, None
+            return obj.get("template_id"), obj.get("version")
+        header: Dict[str, Any] = {}
+        try:
+            with open(path, "rb") as f:
+                for prefix, event, value in ijson.parse(f):
+                    if prefix in ("template_id", "version") and event in (
+                        "string",
+                        "number",
+                    ):
+                        header[prefix] = str(value)
+                        if len(header) == 2:
+                            break
+        except Exception:
+            return None, None
+        return header.get("template_id"), header.get("version")
+
     @staticmethod
     def _ver_tuple(s: str) -> tuple:
         parts = (s or "0.0.0").split(".")
@@ -129,58 +190,66 @@ class TemplateRegistry:
             out.append(0)
         return tuple(out[:3])
 
+    def _finalize(self, tpl: dict, path: str) -> dict:
+        # Shallow copy: the parse cache keeps the original unannotated.
+        tpl = {**tpl, "_source_path": path}
+        if self.validator:
+            self.validator.validate(tpl)
+        return tpl
+
     # ---------- public API ----------
 
     def load(self, template_id: str, version: str | None = None) -> dict:
-        candidates: List[dict] = []
+        # Each step returns as soon as it yields an acceptable template, so the
+        # full scan (which parses every file) only runs as a last resort.
+        id_seen = False
 
-        # 1) Try to resolve via index (supports aliases)
-        idx_res = self._resolve_via_index(template_id)
-        if idx_res:
-            p, t_entry = idx_res
-            obj = self._parse_json(p)
-            if obj:
-                obj["_source_path"] = p
-                candidates.append(obj)
-
-        # 2) Try direct filename match <template_id>.json
+        # 1) Direct filename match <template_id>.json
         direct = self._resolve_direct_filename(template_id)
         if direct:
             obj = self._parse_json(direct)
             if obj and obj.get("template_id") == template_id:
-                obj["_source_path"] = direct
-                candidates.append(obj)
-
-        # 3) Fallback: scan all JSONs and pick those with matching template_id
-        if not candidates:
-            for p in self._iter_template_files():
-                obj = self._parse_json(p)
-                if not obj:
-                    continue
-                if "template_id" not in obj:
-                    continue
-                if obj.get("template_id") == template_id:
-                    obj["_source_path"] = p
-                    candidates.append(obj)
-
-        if not candidates:
+                if version is None or obj.get("version") == version:
+                    return self._finalize(obj, direct)
+                id_seen = True
+
+        # 2) Resolve via index (supports aliases)
+        idx_res = self._resolve_via_index(template_id)
+        if idx_res:
+            p, _ = idx_res
+            obj = self._parse_json(p)
+            if obj:
+                if version is None or obj.get("version") == version:
+                    return self._finalize(obj, p)
+                id_seen = True
+
+        # 3) Fallback: scan all JSONs; stop at an exact version match, otherwise
+        #    keep only the highest version seen. Candidates are matched
+        #    by header; only the chosen file is parsed in full
+        best: Optional[Tuple[str, str]] = None
+        for p in self._iter_template_files():
+            tid, ver = self._peek_header(p)
+            if tid != template_id:
+                continue
+            if version is not None:
+                if ver == version:
+                    obj = self._parse_json(p)
+                    if obj:
+                        return self._finalize(obj, p)
+                id_seen = True
+            elif best is None or self._ver_tuple(ver or "0.0.0") >= self._ver_tuple(
+                best[1]
+            ):
+                best = (p, ver or "0.0.0")
+
+        if best is not None:
+            obj = self._parse_json(best[0])
+            if obj:
+                return self._finalize(obj, best[0])
+        if id_seen:
             raise FileNotFoundError(
-                f"Template '{template_id}' not found in: {self.search_dirs}"
+                f"Template '{template_id}' version '{version}' not found"
             )
-
-        if version:
-            matches = [t for t in candidates if t.get("version") == version]
-            if not matches:
-                raise FileNotFoundError(
-                    f"Template '{template_id}' version '{version}' not found"
-                )
-            tpl = matches[0]
-        else:
-            tpl = sorted(
-                candidates, key=lambda t: self._ver_tuple(t.get("version", "0.0.0"))
-            )[-1]
-
-        if self.validator:
-            self.validator.validate(tpl)
-
-        return tpl
+        raise FileNotFoundError(
+            f"Template '{template_id}' not found in: {self.search_dirs}"
+        )
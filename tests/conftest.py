@@ -0,0 +1,17 @@
+import duckdb
+import pytest
+
+from validator.core.duck import ensure_spatial_extension
+
+
+@pytest.fixture(scope="session")
+def spatial_con():
+    """One DuckDB connection with ``spatial`` loaded, shared by the whole session."""
+    con = duckdb.connect()
+    try:
+        ensure_spatial_extension(con)
+    except duckdb.Error as exc:
+        con.close()
+        pytest.skip(f"DuckDB spatial extension unavailable: {exc}")
+    yield con
+    con.close()
@@ -0,0 +1,116 @@
+import json
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from validator.cli import detect_format, main
+from validator.core.reporting import EXIT_CORRUPTED, EXIT_TYPES_OR_VALUES
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("data.parquet", "GEOPARQUET"),
+        ("DATA.GPKG", "GEOPACKAGE"),
+        ("parcels.shp", "SHAPEFILE"),
+        ("table.csv", "CSV"),
+        ("table.csv.gz", "CSV"),
+        ("table.csv.bz2", "CSV"),
+        ("release.v2/table.csv", "CSV"),
+    ],
+)
+def test_detect_format(path, expected):
+    assert detect_format(path) == expected
+
+
+@pytest.mark.parametrize("path", ["table.gz", "data.parquet.gz", "notes.txt", "noext"])
+def test_detect_format_unknown_extension(path):
+    with pytest.raises(click.UsageError):
+        detect_format(path)
+
+
+def _batch_tree(tmp_path):
+    tpl_dir = tmp_path / "tpl"
+    tpl_dir.mkdir()
+    (tpl_dir / "demo.json").write_text(
+        json.dumps(
+            {
+                "template_id": "demo",
+                "version": "1.0",
+                "columns": [{"name": "code", "dtype": "string", "required": True}],
+            }
+        )
+    )
+    data = tmp_path / "data"
+    for sub, rows in (("a", "code\nP1\n"), ("b", "code\n\n")):
+        (data / sub).mkdir(parents=True)
+        (data / sub / "parcels.csv").write_text(rows)
+    return tpl_dir, data
+
+
+def _run_batch(tpl_dir, pattern, reports):
+    return CliRunner().invoke(
+        main,
+        [
+            "--input-glob",
+            pattern,
+            "--template-id",
+            "demo",
+            "--templates-dir",
+            str(tpl_dir),
+            "--report",
+            str(reports),
+        ],
+    )
+
+
+def test_batch_reports_keep_paths_below_glob_root(tmp_path):
+    tpl_dir, data = _batch_tree(tmp_path)
+    reports = tmp_path / "reports"
+
+    result = _run_batch(tpl_dir, f"{data}/**/*.csv", reports)
+
+    a = json.loads((reports / "a" / "parcels.csv.report.json").read_text())
+    b = json.loads((reports / "b" / "parcels.csv.report.json").read_text())
+    assert a["ok"] is True
+    assert b["ok"] is False
+    assert result.exit_code == EXIT_TYPES_OR_VALUES
+
+
+def test_batch_reports_unrecognized_file_and_continues(tmp_path):
+    tpl_dir, data = _batch_tree(tmp_path)
+    (data / "a" / "notes.txt").write_text("not a dataset")
+    reports = tmp_path / "reports"
+
+    result = _run_batch(tpl_dir, f"{data}/a/*", reports)
+
+    notes = json.loads((reports / "notes.txt.report.json").read_text())
+    assert notes["ok"] is False
+    assert "Cannot detect format" in notes["errors"][0]["detail"]
+    assert json.loads((reports / "parcels.csv.report.json").read_text())["ok"]
+    assert result.exit_code == EXIT_CORRUPTED
+
+
+def test_print_json_writes_the_printed_report(tmp_path):
+    tpl_dir, data = _batch_tree(tmp_path)
+    target = tmp_path / "out" / "report.json"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--input",
+            str(data / "a" / "parcels.csv"),
+            "--template-id",
+            "demo",
+            "--templates-dir",
+            str(tpl_dir),
+            "--print-json",
+            "--report",
+            str(target),
+        ],
+    )
+
+    written = target.read_text()
+    assert written in result.output
+    assert json.loads(written)["ok"] is True
@@ -0,0 +1,91 @@
+import gzip
+import importlib.util
+import sys
+import types
+import zipfile
+
+import pytest
+
+from validator.core import compression
+from validator.core.compression import UnpackError, maybe_decompress
+
+
+def test_maybe_decompress_single_gzip_file(tmp_path):
+    payload = b"code,area\n" + b"P1,1.5\n" * 10_000
+    src = tmp_path / "data.csv.gz"
+    with gzip.open(src, "wb") as f:
+        f.write(payload)
+
+    out, cleanup = maybe_decompress(str(src))
+    try:
+        assert out.name == "data.csv"
+        assert out.read_bytes() == payload
+    finally:
+        cleanup()
+    assert not out.exists()
+
+
+def test_maybe_decompress_gzip_uses_isal_when_installed(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_open(*args, **kwargs):
+        calls.append(args)
+        return gzip.open(*args, **kwargs)
+
+    igzip = types.ModuleType("isal.igzip")
+    igzip.open = fake_open
+    isal = types.ModuleType("isal")
+    isal.igzip = igzip
+    monkeypatch.setitem(sys.modules, "isal", isal)
+    monkeypatch.setitem(sys.modules, "isal.igzip", igzip)
+    # A private copy of the module runs its optional import against the fake.
+    spec = importlib.util.spec_from_file_location(
+        "_compression_with_isal", compression.__file__
+    )
+    with_isal = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(with_isal)
+    assert with_isal._igzip is igzip
+
+    payload = b"code,area\n" + b"P1,1.5\n" * 10_000
+    src = tmp_path / "data.csv.gz"
+    with gzip.open(src, "wb") as f:
+        f.write(payload)
+
+    out, cleanup = with_isal.maybe_decompress(str(src))
+    try:
+        assert calls == [(src, "rb")]
+        assert out.read_bytes() == payload
+    finally:
+        cleanup()
+
+
+@pytest.mark.parametrize("name", ["../evil.csv", "/abs.csv", "a\\..\\..\\b.csv"])
+def test_maybe_decompress_rejects_unsafe_zip_members(tmp_path, name):
+    src = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr(name, "x")
+    with pytest.raises(UnpackError):
+        maybe_decompress(str(src))
+
+
+def test_maybe_decompress_zipped_shapefile_bundle(tmp_path):
+    src = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        for ext in (".shp", ".shx", ".dbf", ".prj"):
+            zf.writestr(f"nested/Parcels{ext}", "x")
+
+    out, cleanup = maybe_decompress(str(src))
+    try:
+        assert out.name == "Parcels.shp"
+        assert out.parent.name == "nested"
+    finally:
+        cleanup()
+
+
+def test_maybe_decompress_rejects_multiple_datasets(tmp_path):
+    src = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("a.csv", "x")
+        zf.writestr("b.csv", "y")
+    with pytest.raises(UnpackError):
+        maybe_decompress(str(src))
@@ -0,0 +1,31 @@
+import duckdb
+
+from validator.adapters.csv_adapter import load_csv_view
+
+
+def _columns(con, view):
+    return [r[0] for r in con.execute(f"DESCRIBE {view}").fetchall()]
+
+
+def test_load_csv_view_projects_needed_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,extra\n1,a,x\n")
+    con = duckdb.connect()
+    try:
+        _, diag = load_csv_view(con, str(path), needed_cols=["name", "missing", "id"])
+        assert _columns(con, "v_raw") == ["id", "name"]
+        assert diag["selected_columns"] == ["name", "id"]
+    finally:
+        con.close()
+
+
+def test_load_csv_view_keeps_all_columns_when_none_match(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name\n1,a\n")
+    con = duckdb.connect()
+    try:
+        _, diag = load_csv_view(con, str(path), needed_cols=["missing"])
+        assert _columns(con, "v_raw") == ["id", "name"]
+        assert diag["selected_columns"] == ["id", "name"]
+    finally:
+        con.close()
@@ -0,0 +1,94 @@
+import os
+from unittest.mock import MagicMock
+
+import duckdb
+import pytest
+
+from validator.core.duck import (
+    close_connection,
+    configure_connection,
+    ensure_sqlite_extension,
+    get_connection,
+    reset_connection,
+)
+
+
+def test_get_connection_is_shared_until_closed():
+    con = get_connection(threads=2)
+    try:
+        assert get_connection() is con
+        assert con.execute("SELECT current_setting('threads')").fetchone()[0] == 2
+    finally:
+        close_connection()
+    other = get_connection()
+    try:
+        assert other is not con
+    finally:
+        close_connection()
+
+
+def test_reset_connection_drops_views_and_temp_tables():
+    con = get_connection()
+    try:
+        con.execute("CREATE TEMP TABLE _tmp AS SELECT 1 AS x")
+        con.execute("CREATE TABLE kept AS SELECT 1 AS x")
+        con.execute("CREATE VIEW v AS SELECT * FROM _tmp")
+        reset_connection(con)
+        assert con.execute(
+            "SELECT count(*) FROM duckdb_views() WHERE NOT internal"
+        ).fetchone() == (0,)
+        assert con.execute("SELECT table_name FROM duckdb_tables()").fetchall() == [
+            ("kept",)
+        ]
+    finally:
+        close_connection()
+
+
+def test_configure_connection_reads_env_overrides(monkeypatch):
+    monkeypatch.setenv("DS_DUCKDB_THREADS", "3")
+    monkeypatch.setenv("DS_DUCKDB_MEM", "512MB")
+    con = duckdb.connect()
+    try:
+        configure_connection(con)
+        assert con.execute("SELECT current_setting('threads')").fetchone()[0] == 3
+        configure_connection(con, threads=2)
+        assert con.execute("SELECT current_setting('threads')").fetchone()[0] == 2
+        limit = con.execute("SELECT current_setting('memory_limit')").fetchone()[0]
+        assert limit.endswith("MiB")
+    finally:
+        con.close()
+
+
+def test_configure_connection_rejects_bad_thread_count(monkeypatch):
+    monkeypatch.setenv("DS_DUCKDB_THREADS", "four")
+    con = duckdb.connect()
+    try:
+        with pytest.raises(ValueError, match="DS_DUCKDB_THREADS"):
+            configure_connection(con)
+    finally:
+        con.close()
+
+
+def test_configure_connection_spills_to_a_private_dir():
+    con = duckdb.connect()
+    try:
+        configure_connection(con)
+        spill = con.execute("SELECT current_setting('temp_directory')").fetchone()[0]
+        assert os.path.basename(spill).startswith("quap_validator_duckdb-")
+        assert os.path.isdir(spill)
+    finally:
+        con.close()
+
+
+def test_ensure_sqlite_extension_installs_only_when_missing():
+    con = MagicMock(spec=["install_extension", "load_extension"])
+    con.load_extension.side_effect = [duckdb.IOException("not installed"), None]
+    ensure_sqlite_extension(con)
+    con.install_extension.assert_called_once_with("sqlite")
+
+    # Any other LOAD failure surfaces instead of triggering an INSTALL.
+    con = MagicMock(spec=["install_extension", "load_extension"])
+    con.load_extension.side_effect = duckdb.InvalidInputException("bad build")
+    with pytest.raises(duckdb.InvalidInputException):
+        ensure_sqlite_extension(con)
+    con.install_extension.assert_not_called()
@@ -0,0 +1,204 @@
+import duckdb
+import pytest
+
+from validator.core import engine
+from validator.core.engine import _bad_cast_predicate, validate_with_duckdb
+
+TEMPLATE = {
+    "template_id": "demo",
+    "version": "1.0",
+    "null_equivalents": [""],
+    "columns": [
+        {"name": "code", "dtype": "string", "required": True},
+        {
+            "name": "area",
+            "dtype": "float64",
+            "required": True,
+            "range": {"min": 0, "max": 100},
+        },
+        {"name": "kind", "dtype": "string", "enum": ["A", "B"]},
+        {"name": "n", "dtype": "int64"},
+    ],
+    "duplicate_checks": [{"keys": ["code"], "severity": "error", "sample_limit": 10}],
+}
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute("""
+        CREATE TABLE v AS SELECT * FROM (VALUES
+          ('P1', '1.5',  'A',  '1'),
+          ('P2', '-3',   'C',  'x'),
+          ('P2', '200',  'B',  '2'),
+          ('',   NULL,   NULL, NULL),
+          ('P4', 'abc',  'A',  '1')
+        ) t(code, area, kind, n)
+        """)
+    yield con
+    con.close()
+
+
+def _by_code(issues):
+    out = {}
+    for issue in issues:
+        out.setdefault(issue["code"], []).append(issue)
+    return out
+
+
+def test_validate_with_duckdb_counts_all_checks(con):
+    res = validate_with_duckdb("v", TEMPLATE, con)
+    errors = _by_code(res["errors"])
+
+    assert res["ok"] is False
+    assert res["row_count"] == 5
+    assert res["metrics"]["nulls"] == {"code": 1, "area": 1, "kind": 1, "n": 1}
+    assert errors["RANGE_VIOLATION"] == [
+        {"code": "RANGE_VIOLATION", "column": "area", "invalid_rows": 2}
+    ]
+    assert errors["ENUM_VIOLATION"] == [
+        {"code": "ENUM_VIOLATION", "column": "kind", "invalid_rows": 1}
+    ]
+    assert errors["DTYPE_MISMATCH"][0]["details"] == [
+        {"column": "area", "expected": "float64", "invalid_rows": 1},
+        {"column": "n", "expected": "int64", "invalid_rows": 1},
+    ]
+    assert {e["column"] for e in errors["NULL_REQUIRED"]} == {"code", "area"}
+    assert errors["DUPLICATES"][0]["examples"] == [{"code": "P2", "count": 2}]
+
+
+def test_validate_with_duckdb_reports_missing_columns(con):
+    tpl = {
+        **TEMPLATE,
+        "columns": TEMPLATE["columns"] + [{"name": "absent", "dtype": "string"}],
+    }
+    res = validate_with_duckdb("v", tpl, con)
+    assert res["errors"][0] == {"code": "MISSING_COLUMNS", "columns": ["absent"]}
+
+
+def test_validate_with_duckdb_binds_literal_values():
+    con = duckdb.connect()
+    try:
+        con.execute(
+            "CREATE TABLE q AS SELECT * FROM (VALUES ('it''s'), ('n/a'), ('x')) t(k)"
+        )
+        tpl = {
+            "null_equivalents": ["n/a"],
+            "columns": [{"name": "k", "dtype": "string", "enum": ["it's"]}],
+        }
+        res = validate_with_duckdb("q", tpl, con)
+        assert res["metrics"]["nulls"] == {"k": 1}
+        assert res["errors"] == [
+            {"code": "ENUM_VIOLATION", "column": "k", "invalid_rows": 1}
+        ]
+    finally:
+        con.close()
+
+
+def test_validate_with_duckdb_large_enum_matches_in_list(con, monkeypatch):
+    small = validate_with_duckdb("v", TEMPLATE, con)
+    monkeypatch.setattr(engine, "ENUM_SEMI_JOIN_MIN", 1)
+    large = validate_with_duckdb("v", TEMPLATE, con)
+    assert large["errors"] == small["errors"]
+
+
+@pytest.mark.parametrize(
+    "logical,duck_type,skipped",
+    [
+        ("int64", "INTEGER", True),
+        ("float64", "DECIMAL(18,3)", True),
+        ("string", "BIGINT", True),
+        ("int64", "DOUBLE", False),
+        ("date", "VARCHAR", False),
+    ],
+)
+def test_bad_cast_predicate_skips_natively_typed_columns(logical, duck_type, skipped):
+    assert (_bad_cast_predicate("c", logical, duck_type, None) is None) is skipped
+
+
+def test_validate_with_duckdb_duplicate_rules_share_one_scan(con):
+    tpl = {
+        **TEMPLATE,
+        "duplicate_checks": [
+            {"keys": ["code"], "severity": "error", "sample_limit": 10},
+            {"keys": ["kind", "n"], "severity": "warning", "sample_limit": 10},
+            {"keys": ["n"], "severity": "warning", "sample_limit": 1},
+            {"keys": ["area"], "severity": "error"},
+        ],
+    }
+    res = validate_with_duckdb("v", tpl, con)
+    dups = [i for i in res["errors"] + res["warnings"] if i["code"] == "DUPLICATES"]
+    assert dups == [
+        {
+            "code": "DUPLICATES",
+            "keys": ["code"],
+            "examples": [{"code": "P2", "count": 2}],
+        },
+        {
+            "code": "DUPLICATES",
+            "keys": ["kind", "n"],
+            "examples": [{"kind": "A", "n": "1", "count": 2}],
+        },
+        {"code": "DUPLICATES", "keys": ["n"], "examples": [{"n": "1", "count": 2}]},
+    ]
+
+
+def test_validate_with_duckdb_range_on_native_columns():
+    con = duckdb.connect()
+    try:
+        con.execute(
+            "CREATE TABLE t AS SELECT * FROM (VALUES (1, 0.5::DECIMAL(4,2)), "
+            "(50, 99.0), (150, -1.0), (NULL, NULL)) t(i, d)"
+        )
+        tpl = {
+            "columns": [
+                {"name": "i", "dtype": "int64", "range": {"min": 0, "max": 100}},
+                {"name": "d", "dtype": "float64", "range": {"min": 0.0}},
+            ]
+        }
+        res = validate_with_duckdb("t", tpl, con)
+        assert res["errors"] == [
+            {"code": "RANGE_VIOLATION", "column": "i", "invalid_rows": 1},
+            {"code": "RANGE_VIOLATION", "column": "d", "invalid_rows": 1},
+        ]
+    finally:
+        con.close()
+
+
+@pytest.mark.parametrize("semi_join_min", [1, 100])
+@pytest.mark.parametrize(
+    "column_sql, enum, invalid",
+    [
+        # numeric enum of 8+ values on an ALL_VARCHAR (CSV-style) column
+        ("VALUES ('1'), ('5'), ('x'), ('12')", list(range(1, 9)), 2),
+        # string enum on an integer column
+        ("VALUES (1::BIGINT), (2), (7)", ["1", "2", "3"], 1),
+        # numeric enum on a numeric column stays a native comparison
+        ("VALUES (1.5::DOUBLE), (2.0), (3.0)", [1.5, 2], 1),
+        ("VALUES (true), (false)", [True], 1),
+    ],
+)
+def test_validate_with_duckdb_enum_types_differ_from_column(
+    monkeypatch, semi_join_min, column_sql, enum, invalid
+):
+    monkeypatch.setattr(engine, "ENUM_SEMI_JOIN_MIN", semi_join_min)
+    con = duckdb.connect()
+    try:
+        con.execute(f"CREATE TABLE e AS SELECT * FROM ({column_sql}) t(c)")
+        tpl = {"columns": [{"name": "c", "dtype": "string", "enum": enum}]}
+        res = validate_with_duckdb("e", tpl, con)
+        assert _by_code(res["errors"])["ENUM_VIOLATION"] == [
+            {"code": "ENUM_VIOLATION", "column": "c", "invalid_rows": invalid}
+        ]
+    finally:
+        con.close()
+
+
+def test_ensure_geometry_alias_quotes_view_names():
+    con = duckdb.connect()
+    try:
+        con.execute('CREATE VIEW "in-view" AS SELECT 1 AS id, NULL AS lpis_geom')
+        engine.ensure_geometry_alias(con, "in-view", "out view", "lpis_geom", ["geom"])
+        assert con.execute('SELECT id FROM "out view"').fetchall() == [(1,)]
+    finally:
+        con.close()
@@ -1,11 +1,10 @@
-import pathlib
-import sys
-
 import duckdb
+import pytest
 
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
-
-from validator.core.geom_alias import normalize_geometry_view
+from validator.core.geom_alias import (
+    guess_canonical_by_columns,
+    normalize_geometry_view,
+)
 
 
 def test_normalize_geometry_view_without_geometry_columns():
@@ -17,3 +16,17 @@ def test_normalize_geometry_view_without_geometry_columns():
         assert result["canonical"] is None
     finally:
         con.close()
+
+
+@pytest.mark.parametrize(
+    "cols, expected",
+    [
+        (["lpis_geom", "gsa_geom"], "lpis_geom"),
+        (["gem"], "gsa_geom"),
+        (["lpis_code", "gsa_par_id"], "gsa_geom"),
+        (["lpis_code", "id"], "lpis_geom"),
+        (["id", "geometry"], None),
+    ],
+)
+def test_guess_canonical_by_columns(cols, expected):
+    assert guess_canonical_by_columns(dict.fromkeys(cols, "VARCHAR")) == expected
@@ -0,0 +1,171 @@
+import sqlite3
+
+import duckdb
+import pytest
+
+from validator.adapters import gpkg_adapter
+from validator.adapters.gpkg_adapter import gpkg_integrity_errors, load_gpkg_view
+
+
+def _make_gpkg(path, rows):
+    with sqlite3.connect(path) as db:
+        db.execute(
+            'CREATE TABLE "parcels" (fid INTEGER PRIMARY KEY, code TEXT, area REAL)'
+        )
+        db.executemany('INSERT INTO "parcels" (code, area) VALUES (?, ?)', rows)
+
+
+def test_load_gpkg_view_copies_all_rows(tmp_path):
+    path = str(tmp_path / "parcels.gpkg")
+    rows = [(f"P{i}", float(i)) for i in range(25)] + [(None, None)]
+    _make_gpkg(path, rows)
+
+    con = duckdb.connect()
+    try:
+        view, diag = load_gpkg_view(con, path, "parcels", ["code", "area"])
+        assert view == "v"
+        assert diag["selected_columns"] == ["code", "area"]
+        got = con.execute(
+            "SELECT code, CAST(area AS DOUBLE) FROM v ORDER BY ALL"
+        ).fetchall()
+        assert len(got) == 26
+        assert ("P3", 3.0) in got
+        assert (None, None) in got
+    finally:
+        con.close()
+
+
+def test_load_gpkg_view_fallback_spans_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(gpkg_adapter, "FALLBACK_CHUNK_ROWS", 4)
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [(f"P{i}", float(i)) for i in range(10)])
+
+    con = duckdb.connect()
+    try:
+        load_gpkg_view(con, path, "parcels", ["code"])
+        assert con.execute("SELECT COUNT(DISTINCT code) FROM v").fetchone()[0] == 10
+    finally:
+        con.close()
+
+
+def test_gpkg_integrity_header_only(tmp_path, monkeypatch):
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.0)])
+    monkeypatch.setenv("QUAP_SKIP_INTEGRITY", "1")
+
+    # Plain SQLite file: magic is fine but application_id is not 'GPKG'.
+    assert gpkg_integrity_errors(path) == ["unexpected_application_id: 0x0"]
+
+    with sqlite3.connect(path) as db:
+        db.execute("PRAGMA application_id=0x47504B47")
+    assert gpkg_integrity_errors(path) == []
+
+    bogus = tmp_path / "bogus.gpkg"
+    bogus.write_bytes(b"not a database" * 10)
+    assert gpkg_integrity_errors(str(bogus)) == ["not_a_sqlite_database"]
+
+
+def test_maybe_materialize_only_for_needed_normalized_geometry(monkeypatch):
+    monkeypatch.setattr(gpkg_adapter, "GEOMETRY_MATERIALIZE_MIN_ROWS", 2)
+    con = duckdb.connect()
+    try:
+        con.execute("CREATE VIEW v AS SELECT range AS gsa_geom FROM range(3)")
+        norm = {"normalized": True, "canonical": "gsa_geom"}
+        assert not gpkg_adapter._maybe_materialize(con, "v", norm, ["code"], n_rows=3)
+        assert not gpkg_adapter._maybe_materialize(
+            con, "v", norm, ["gsa_geom"], n_rows=1
+        )
+        assert gpkg_adapter._maybe_materialize(con, "v", norm, ["gsa_geom"], n_rows=3)
+        assert con.execute("SELECT COUNT(*) FROM v_mat").fetchone()[0] == 3
+    finally:
+        con.close()
+
+
+def test_gpkg_table_columns_cache_follows_file_changes(tmp_path):
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.0)])
+    assert gpkg_adapter.gpkg_table_columns(path, "parcels") == ["fid", "code", "area"]
+
+    gpkg_adapter.close_gpkg_connections()
+    with sqlite3.connect(path) as db:
+        db.execute('ALTER TABLE "parcels" ADD COLUMN kind TEXT')
+    assert gpkg_adapter.gpkg_table_columns(path, "parcels")[-1] == "kind"
+
+
+def test_close_gpkg_connections_clears_pragma_caches(tmp_path):
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.0)])
+    gpkg_adapter.gpkg_table_columns(path, "parcels")
+    assert gpkg_adapter._table_info.cache_info().currsize
+
+    gpkg_adapter.close_gpkg_connections()
+    assert not gpkg_adapter._CONN_CACHE
+    assert gpkg_adapter._table_info.cache_info().currsize == 0
+
+
+def test_load_gpkg_view_fallback_keeps_declared_numeric_types(tmp_path):
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.5), ("P2", 2)])
+
+    con = duckdb.connect()
+    try:
+        _, diag = load_gpkg_view(con, path, "parcels", ["code", "area"])
+        types = dict(
+            con.execute("SELECT column_name, column_type FROM (DESCRIBE v)").fetchall()
+        )
+        if diag.get("mode") == "sqlite_scanner":
+            pytest.skip("the scanner path reads every column as VARCHAR")
+        assert diag["typed_copy"] is True
+        assert types == {"code": "VARCHAR", "area": "DOUBLE"}
+    finally:
+        con.close()
+
+
+def test_load_gpkg_view_fallback_retries_as_varchar_on_bad_values(tmp_path):
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.5), ("P2", "not a number")])
+
+    con = duckdb.connect()
+    try:
+        _, diag = load_gpkg_view(con, path, "parcels", ["code", "area"])
+        got = con.execute("SELECT area FROM v ORDER BY code").fetchall()
+        assert got == [("1.5",), ("not a number",)]
+        assert diag.get("typed_copy", False) is False
+    finally:
+        con.close()
+
+
+def test_load_gpkg_view_scanner_layer_stays_a_view(tmp_path, monkeypatch):
+    probe = duckdb.connect()
+    try:
+        gpkg_adapter.ensure_sqlite_extension(probe)
+    except duckdb.Error as exc:
+        pytest.skip(f"DuckDB sqlite extension unavailable: {exc}")
+    finally:
+        probe.close()
+
+    path = str(tmp_path / "parcels.gpkg")
+    _make_gpkg(path, [("P1", 1.0), ("P2", 2.0), ("P3", 3.0)])
+    monkeypatch.setattr(gpkg_adapter, "GEOMETRY_MATERIALIZE_MIN_ROWS", 1)
+
+    def fake_normalize(con, src_view, dst_view, explicit_canonical=None):
+        con.execute(
+            f"CREATE OR REPLACE VIEW {dst_view} AS SELECT *, code AS gsa_geom "
+            f"FROM {src_view}"
+        )
+        return {"normalized": True, "canonical": "gsa_geom"}
+
+    monkeypatch.setattr(gpkg_adapter, "_normalize_geometry_view", fake_normalize)
+
+    con = duckdb.connect()
+    try:
+        _, diag = load_gpkg_view(con, path, "parcels", ["code", "gsa_geom"])
+        assert diag["mode"] == "sqlite_scanner"
+        assert diag["materialized"] is False
+        kind = con.execute(
+            "SELECT table_type FROM information_schema.tables WHERE table_name = 'v'"
+        ).fetchone()[0]
+        assert kind == "VIEW"
+        assert con.execute("SELECT COUNT(*) FROM v").fetchone()[0] == 3
+    finally:
+        con.close()
@@ -0,0 +1,64 @@
+import struct
+
+import duckdb
+import pyarrow as pa
+import pyogrio
+
+from validator.adapters.shapefile_adapter import load_shapefile_into_duck
+
+
+def _point(x, y):
+    return struct.pack("<BIdd", 1, 1, x, y)
+
+
+def _write_shapefile(path, n):
+    table = pa.table(
+        {
+            "code": pa.array([f"P{i}" for i in range(n)], pa.string()),
+            "area": pa.array([float(i) for i in range(n)], pa.float64()),
+            "geometry": pa.array([_point(i, i) for i in range(n)], pa.binary()),
+        }
+    )
+    pyogrio.write_arrow(
+        table,
+        str(path),
+        geometry_name="geometry",
+        geometry_type="Point",
+        crs="EPSG:4326",
+        driver="ESRI Shapefile",
+    )
+
+
+def test_load_shapefile_streams_arrow_with_native_types(tmp_path):
+    path = tmp_path / "parcels.shp"
+    _write_shapefile(path, 3)
+    con = duckdb.connect()
+    try:
+        view, diag = load_shapefile_into_duck(con, str(path), ["code", "area", "nope"])
+        assert view == "v"
+        assert diag["selected_columns"] == ["code", "area"]
+        assert diag["loaded_rows"] == 3
+        types = dict(
+            con.execute("SELECT column_name, column_type FROM (DESCRIBE v)").fetchall()
+        )
+        assert types["area"] == "DOUBLE"
+        assert con.execute("SELECT code FROM v ORDER BY code").fetchall() == [
+            ("P0",),
+            ("P1",),
+            ("P2",),
+        ]
+    finally:
+        con.close()
+
+
+def test_load_shapefile_empty_layer_keeps_columns(tmp_path):
+    path = tmp_path / "empty.shp"
+    _write_shapefile(path, 0)
+    con = duckdb.connect()
+    try:
+        _, diag = load_shapefile_into_duck(con, str(path), ["code"])
+        assert diag["loaded_rows"] == 0
+        cols = [r[0] for r in con.execute("DESCRIBE v").fetchall()]
+        assert "code" in cols
+    finally:
+        con.close()
@@ -1,73 +1,97 @@
-import pathlib
-import sys
+from unittest.mock import MagicMock
 
 import duckdb
+import pytest
 
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+from validator.core import duck
+from validator.core.duck import _SPATIAL_EXTENSION_LOADED, ensure_spatial_extension
 
-from validator.core.duck import ensure_spatial_extension
 
+def _load_side_effect(fail_once: bool):
+    state = {"fail": fail_once}
 
-class DummyConnection:
-    def __init__(self):
-        self.install_calls = 0
-        self.load_calls = 0
-        self._should_fail = True
-
-    def install_extension(self, name: str) -> None:
-        assert name == "spatial"
-        self.install_calls += 1
-
-    def load_extension(self, name: str) -> None:
+    def load(name: str) -> None:
         assert name == "spatial"
-        self.load_calls += 1
-        if self._should_fail:
-            self._should_fail = False
+        if state["fail"]:
+            state["fail"] = False
             raise duckdb.IOException("Extension 'spatial' not installed")
 
+    return load
+
+
+def make_con(fail_once: bool = True) -> MagicMock:
+    # spec: any other attribute (e.g. the legacy loaded tag) must not exist.
+    con = MagicMock(spec=["install_extension", "load_extension"])
+    con.load_extension.side_effect = _load_side_effect(fail_once)
+    return con
+
+
+class UntrackableConnection:
+    """Slotted without __weakref__: neither the WeakSet nor an attribute can tag it."""
+
+    __slots__ = ("install_extension", "load_extension")
+
+    def __init__(self, fail_once: bool = True):
+        self.install_extension = MagicMock()
+        self.load_extension = MagicMock(side_effect=_load_side_effect(fail_once))
+
+
+@pytest.fixture(autouse=True)
+def _extension_not_on_disk(monkeypatch):
+    # Each test starts as if no connection in the process had loaded spatial yet.
+    monkeypatch.setattr(duck, "_SPATIAL_INSTALLED_ON_DISK", False)
+
 
 def test_ensure_spatial_extension_installs_and_caches():
-    con = DummyConnection()
+    con = make_con()
 
     ensure_spatial_extension(con)
-
-    assert con.install_calls == 1
-    assert con.load_calls == 2  # initial failure + retry after install
-    assert getattr(con, "_validator_spatial_loaded") is True
+    con.install_extension.assert_called_once_with("spatial")
+    assert con.load_extension.call_count == 2  # initial failure + retry after install
+    assert con in _SPATIAL_EXTENSION_LOADED
 
     ensure_spatial_extension(con)
-    assert con.install_calls == 1
-    assert con.load_calls == 2
+    assert con.install_extension.call_count == 1
+    assert con.load_extension.call_count == 2
 
 
-class SlotsConnection:
-    __slots__ = ("install_calls", "load_calls", "_should_fail", "__weakref__")
+def test_ensure_spatial_extension_loads_without_install_when_on_disk():
+    con = make_con(fail_once=False)
 
-    def __init__(self):
-        self.install_calls = 0
-        self.load_calls = 0
-        self._should_fail = True
+    ensure_spatial_extension(con)
 
-    def install_extension(self, name: str) -> None:
-        assert name == "spatial"
-        self.install_calls += 1
+    con.install_extension.assert_not_called()
+    assert con.load_extension.call_count == 1
 
-    def load_extension(self, name: str) -> None:
-        assert name == "spatial"
-        self.load_calls += 1
-        if self._should_fail:
-            self._should_fail = False
-            raise duckdb.IOException("Extension 'spatial' not installed")
 
+def test_ensure_spatial_extension_without_weakref_support():
+    con = UntrackableConnection()
 
-def test_ensure_spatial_extension_handles_attribute_errors():
-    con = SlotsConnection()
+    ensure_spatial_extension(con)
+    assert con.install_extension.call_count == 1
+    assert con.load_extension.call_count == 2
 
+    # Untrackable, so the next call loads again (but never reinstalls).
     ensure_spatial_extension(con)
-    assert con.install_calls == 1
-    assert con.load_calls == 2
-    assert not hasattr(con, "_validator_spatial_loaded")
+    assert con.install_extension.call_count == 1
+    assert con.load_extension.call_count == 3
 
+
+def test_install_is_shared_across_connections():
+    ensure_spatial_extension(make_con())
+
+    con = make_con(fail_once=False)
     ensure_spatial_extension(con)
-    assert con.install_calls == 1
-    assert con.load_calls == 2
+    con.install_extension.assert_not_called()
+    assert con.load_extension.call_count == 1
+
+    # Once on disk, a failing LOAD is a real error and is not retried.
+    con = make_con()
+    with pytest.raises(duckdb.IOException):
+        ensure_spatial_extension(con)
+    con.install_extension.assert_not_called()
+
+
+def test_spatial_con_has_geometry_functions(spatial_con):
+    wkt = spatial_con.execute("SELECT ST_AsText(ST_Point(1, 2))").fetchone()[0]
+    assert wkt == "POINT (1 2)"
@@ -0,0 +1,118 @@
+import importlib.util
+import json
+import sys
+import types
+
+import pytest
+
+from validator.core import templates
+from validator.core.templates import TemplateRegistry
+
+
+def _write_schema(path, required):
+    path.write_text(json.dumps({"type": "object", "required": required}))
+
+
+def test_registries_share_compiled_validator(tmp_path):
+    schema = tmp_path / "t.schema.json"
+    _write_schema(schema, ["template_id"])
+    a = TemplateRegistry(search_dirs=[str(tmp_path)], schema_path=str(schema))
+    b = TemplateRegistry(search_dirs=[str(tmp_path)], schema_path=str(schema))
+    assert a.validator is b.validator
+
+
+def test_edited_schema_is_recompiled(tmp_path):
+    schema = tmp_path / "t.schema.json"
+    _write_schema(schema, ["template_id"])
+    a = TemplateRegistry(search_dirs=[str(tmp_path)], schema_path=str(schema))
+    _write_schema(schema, ["template_id", "version"])
+    b = TemplateRegistry(search_dirs=[str(tmp_path)], schema_path=str(schema))
+    assert a.validator is not b.validator
+    assert b.schema["required"] == ["template_id", "version"]
+
+
+def test_parse_cache_tracks_file_changes(tmp_path):
+    tpl = tmp_path / "a.json"
+    tpl.write_text(json.dumps({"template_id": "a", "version": "1.0", "columns": []}))
+    reg = TemplateRegistry(search_dirs=[str(tmp_path)])
+    first = reg.load("a")
+    assert reg.load("a") is not first  # annotated copies, one per load
+    assert "_source_path" not in reg._parse_cache[str(tpl)][1]
+
+    tpl.write_text(json.dumps({"template_id": "a", "version": "1.10", "columns": []}))
+    assert reg.load("a")["version"] == "1.10"
+
+
+def test_load_falls_back_to_scan_for_other_versions(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps({"template_id": "a", "version": "1.0"}))
+    (tmp_path / "a_v2.json").write_text(
+        json.dumps({"template_id": "a", "version": "2.0"})
+    )
+    reg = TemplateRegistry(search_dirs=[str(tmp_path)])
+    assert reg.load("a")["_source_path"] == str(tmp_path / "a.json")
+    assert reg.load("a", "2.0")["_source_path"] == str(tmp_path / "a_v2.json")
+    with pytest.raises(FileNotFoundError, match="version '3.0'"):
+        reg.load("a", "3.0")
+
+
+def _fake_ijson(seen_keys):
+    """Minimal ijson.parse: top-level events only, parsed with json."""
+
+    def parse(f):
+        obj = json.load(f)
+        yield "", "start_map", None
+        for k, v in obj.items():
+            seen_keys.append(k)
+            yield "", "map_key", k
+            if isinstance(v, str):
+                yield k, "string", v
+            elif isinstance(v, (dict, list)):
+                kind = "map" if isinstance(v, dict) else "array"
+                yield k, f"start_{kind}", None
+                yield k, f"end_{kind}", None
+            else:
+                yield k, "number", v
+        yield "", "end_map", None
+
+    return types.SimpleNamespace(parse=parse)
+
+
+def test_peek_header_reads_cached_parse_without_copying(tmp_path, monkeypatch):
+    path = tmp_path / "b.json"
+    path.write_text(json.dumps({"template_id": "b", "version": "1.0", "columns": []}))
+    monkeypatch.setattr(templates, "ijson", None)
+    reg = TemplateRegistry(search_dirs=[str(tmp_path)])
+
+    assert reg._peek_header(str(path)) == ("b", "1.0")
+    cached = reg._parse_cache[str(path)][1]
+    assert reg._parse_json(str(path)) is cached
+    assert reg._peek_header(str(path)) == ("b", "1.0")
+    assert reg._parse_cache[str(path)][1] is cached
+
+
+def test_scan_peeks_headers_with_ijson_when_installed(tmp_path, monkeypatch):
+    seen_keys = []
+    monkeypatch.setitem(sys.modules, "ijson", _fake_ijson(seen_keys))
+    # A private copy of the module runs its optional import against the fake.
+    spec = importlib.util.spec_from_file_location(
+        "_templates_with_ijson", templates.__file__
+    )
+    with_ijson = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(with_ijson)
+    assert with_ijson.ijson is sys.modules["ijson"]
+
+    body = {"template_id": "a", "version": "2.0", "columns": [{"name": "x"}]}
+    (tmp_path / "a_v2.json").write_text(json.dumps(body))
+    (tmp_path / "other.json").write_text(
+        json.dumps({"template_id": "b", "version": "1.0", "columns": []})
+    )
+
+    reg = with_ijson.TemplateRegistry(search_dirs=[str(tmp_path)])
+    assert reg._peek_header(str(tmp_path / "a_v2.json")) == ("a", "2.0")
+    # Stopped once both header keys were seen, before the columns.
+    assert "columns" not in seen_keys
+
+    tpl = reg.load("a")
+    plain = TemplateRegistry(search_dirs=[str(tmp_path)]).load("a")
+    assert tpl == plain
+    assert tpl["columns"] == [{"name": "x"}]